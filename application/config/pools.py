@@ -0,0 +1,48 @@
+import threading
+import time
+
+import redis
+from redis import asyncio as redis_asyncio
+
+
+# Per-process connection checkout timings, keyed by pool name.
+_metrics_lock = threading.Lock()
+_pool_metrics: dict[str, dict[str, float]] = {}
+
+
+def record_pool_wait(pool: str, seconds: float) -> None:
+    with _metrics_lock:
+        metrics = _pool_metrics.setdefault(pool, {"checkouts": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0})
+        metrics["checkouts"] += 1
+        metrics["wait_seconds_total"] += seconds
+        metrics["wait_seconds_max"] = max(metrics["wait_seconds_max"], seconds)
+
+
+def get_pool_metrics() -> dict[str, dict[str, float]]:
+    with _metrics_lock:
+        return {
+            pool: {
+                **metrics,
+                "wait_ms_avg": round(metrics["wait_seconds_total"] * 1000 / metrics["checkouts"], 3) if metrics["checkouts"] else 0.0,
+            }
+            for pool, metrics in _pool_metrics.items()
+        }
+
+
+class TimedBlockingConnectionPool(redis.BlockingConnectionPool):
+    # Used by the Django Redis cache: waits for a free connection instead of failing, and records how long.
+    def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            return super().get_connection(command_name, *keys, **options)
+        finally:
+            record_pool_wait("redis", time.perf_counter() - started)
+
+
+class TimedAsyncBlockingConnectionPool(redis_asyncio.BlockingConnectionPool):
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            record_pool_wait("redis_async", time.perf_counter() - started)
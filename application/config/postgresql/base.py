@@ -0,0 +1,16 @@
+import time
+
+from django.db.backends.postgresql import base
+
+from config.pools import record_pool_wait
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # The stock PostgreSQL backend, timing every connection checkout: a fresh connect when
+    # persistent connections are used, or the wait for a free connection with DATABASE_POOL.
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            record_pool_wait(f"database:{self.alias}", time.perf_counter() - started)
@@ -27,7 +27,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "config.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -55,13 +55,15 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
+# "gunicorn" serves config.wsgi with sync workers; "uvicorn" serves config.asgi and the async list API view.
+WEB_SERVER = os.getenv("WEB_SERVER", "gunicorn").lower()
 
 database_url = os.getenv("DATABASE_URL")
 if database_url:
     parsed_db = urlparse(database_url)
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.postgresql",
+            "ENGINE": "config.postgresql",
             "NAME": (parsed_db.path or "/mydb").lstrip("/"),
             "USER": parsed_db.username or "postgres",
             "PASSWORD": parsed_db.password or "postgres",
@@ -72,7 +74,7 @@ if database_url:
 else:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.postgresql",
+            "ENGINE": "config.postgresql",
             "NAME": os.getenv("POSTGRES_DB", "mydb"),
             "USER": os.getenv("POSTGRES_USER", "postgres"),
             "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
@@ -81,12 +83,38 @@ else:
         }
     }
 
+# Web workers and Celery tasks reuse their connection for DATABASE_CONN_MAX_AGE seconds, checked before reuse.
+# DATABASE_POOL=true uses Django's psycopg 3 pool instead (install psycopg[binary,pool]); prefer it under
+# ASGI, where per-thread persistent connections are not released reliably. Sizes are per process.
+DATABASE_POOL = os.getenv("DATABASE_POOL", "false").lower() == "true"
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv("DATABASE_CONN_HEALTH_CHECKS", "true").lower() == "true"
+if DATABASE_POOL:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT_SECONDS", "10")),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DATABASE_CONN_MAX_AGE", "0" if WEB_SERVER == "uvicorn" else "60"))
+
 redis_cache_url = os.getenv("REDIS_CACHE_URL") or os.getenv("REDIS_URL") or "redis://127.0.0.1:6379/1"
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
         "LOCATION": redis_cache_url,
         "TIMEOUT": int(os.getenv("CACHE_TIMEOUT_SECONDS", "600")),
+        # A blocking pool queues callers for up to REDIS_POOL_TIMEOUT_SECONDS once every connection is busy.
+        "OPTIONS": {
+            "pool_class": "config.pools.TimedBlockingConnectionPool",
+            "max_connections": int(os.getenv("REDIS_CACHE_MAX_CONNECTIONS", "50")),
+            "timeout": float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", "5")),
+            "socket_timeout": float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "5")),
+            "socket_connect_timeout": float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "5")),
+            "health_check_interval": int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL_SECONDS", "30")),
+        },
     }
 }
 
@@ -105,20 +133,90 @@ STORAGES = {
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/"
+# Sessions are read from the Redis cache and written through to the database.
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+# Lifetime of the signed bearer tokens issued by /api/login/ and /api/signup/. They cannot be revoked
+# early except by rotating DJANGO_SECRET_KEY, and is_active is only checked when a view loads the user,
+# so a deactivated user keeps reading cached pages for up to this long. Keep it short.
+API_TOKEN_MAX_AGE_SECONDS = int(os.getenv("API_TOKEN_MAX_AGE_SECONDS", str(24 * 60 * 60)))
 LOGOUT_REDIRECT_URL = "/login/"
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL") or os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND") or os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TIMEZONE = TIME_ZONE
+# Attrition aggregates for /api/employees/stats/; reloads rebuild them too, this catches single-row edits.
+EMPLOYEE_STATS_REFRESH_SECONDS = int(os.getenv("EMPLOYEE_STATS_REFRESH_SECONDS", "3600"))
+
+# Columnar NumPy snapshot (optional numpy package) shared by all workers via mmap; serves filtered pages and stats.
+EMPLOYEE_SNAPSHOT_ENABLED = os.getenv("EMPLOYEE_SNAPSHOT_ENABLED", "false").lower() == "true"
+# The Celery worker writes the snapshot and web processes read it: with separate containers or hosts this must
+# be a volume mounted at the same path in all of them; otherwise web keeps falling back to SQL.
+EMPLOYEE_SNAPSHOT_DIR = Path(os.getenv("EMPLOYEE_SNAPSHOT_DIR", str(BASE_DIR / "snapshots")))
+EMPLOYEE_SNAPSHOT_REFRESH_SECONDS = int(os.getenv("EMPLOYEE_SNAPSHOT_REFRESH_SECONDS", "3600"))
+
+EMPLOYEE_DELTA_REFRESH_SECONDS = int(os.getenv("EMPLOYEE_DELTA_REFRESH_SECONDS", "300"))
+# Warmed offset pages stay in Redis until the next full rewarm (see cache_service._warmed_page_timeout).
+EMPLOYEE_FULL_REFRESH_SECONDS = int(os.getenv("EMPLOYEE_FULL_REFRESH_SECONDS", "3600"))
+
 CELERY_BEAT_SCHEDULE = {
-    "refresh-employee-cache-every-5-minutes": {
+    # Frequent delta refreshes rewrite only pages containing changed rows; the full rewarm is a rare safety net.
+    "refresh-changed-employee-pages": {
+        "task": "employees.tasks.refresh_changed_employee_pages",
+        "schedule": float(EMPLOYEE_DELTA_REFRESH_SECONDS),
+    },
+    "refresh-employee-cache": {
         "task": "employees.tasks.refresh_employee_cache",
-        "schedule": 300.0,
-    }
+        "schedule": float(EMPLOYEE_FULL_REFRESH_SECONDS),
+    },
+    "refresh-employee-stats": {
+        "task": "employees.tasks.refresh_employee_stats",
+        "schedule": float(EMPLOYEE_STATS_REFRESH_SECONDS),
+    },
+    "refresh-employee-snapshot": {
+        "task": "employees.tasks.refresh_employee_snapshot",
+        "schedule": float(EMPLOYEE_SNAPSHOT_REFRESH_SECONDS),
+    },
 }
 
+# Where job progress lives: "file" (PROGRESS_LOG_PATH, one node only), "redis" or "database" for several workers.
+PROGRESS_TRACKER_BACKEND = os.getenv("PROGRESS_TRACKER_BACKEND", "file").lower()
+# How long a node holds the lease on an interrupted job it resumes before another node may take over.
+PROGRESS_LEASE_SECONDS = int(os.getenv("PROGRESS_LEASE_SECONDS", "3600"))
 PROGRESS_LOG_PATH = BASE_DIR / "progress.log"
+# The progress log is fsynced every N writes and compacted to one line per job once it reaches this size.
+PROGRESS_LOG_FSYNC_EVERY = int(os.getenv("PROGRESS_LOG_FSYNC_EVERY", "50"))
+PROGRESS_LOG_COMPACT_BYTES = int(os.getenv("PROGRESS_LOG_COMPACT_BYTES", str(8 * 1024 * 1024)))
+
+# The HTML list can show the planner's pg_class.reltuples estimate instead of an exact COUNT(*).
+EMPLOYEE_COUNT_ESTIMATE_FOR_UI = os.getenv("EMPLOYEE_COUNT_ESTIMATE_FOR_UI", "false").lower() == "true"
+EMPLOYEE_COUNT_ESTIMATE_TIMEOUT_SECONDS = int(os.getenv("EMPLOYEE_COUNT_ESTIMATE_TIMEOUT_SECONDS", "300"))
+# Pre-serialized API page bodies are stored compressed: "gzip", "br" (needs the brotli package) or "identity".
+EMPLOYEE_PAGE_BODY_ENCODING = os.getenv("EMPLOYEE_PAGE_BODY_ENCODING", "gzip").lower()
+
+# Cached pages go soft-stale after EMPLOYEE_PAGE_SOFT_TTL_SECONDS and stay in Redis for the grace period.
+# Meanwhile one request per page rebuilds it under a Redis lock and the others get the stale copy.
+EMPLOYEE_PAGE_SOFT_TTL_SECONDS = int(os.getenv("EMPLOYEE_PAGE_SOFT_TTL_SECONDS", os.getenv("CACHE_TIMEOUT_SECONDS", "600")))
+EMPLOYEE_PAGE_STALE_GRACE_SECONDS = int(os.getenv("EMPLOYEE_PAGE_STALE_GRACE_SECONDS", "300"))
+EMPLOYEE_PAGE_LOCK_TIMEOUT_SECONDS = int(os.getenv("EMPLOYEE_PAGE_LOCK_TIMEOUT_SECONDS", "30"))
+EMPLOYEE_PAGE_LOCK_WAIT_SECONDS = float(os.getenv("EMPLOYEE_PAGE_LOCK_WAIT_SECONDS", "2"))
+EMPLOYEE_PAGE_XFETCH_BETA = float(os.getenv("EMPLOYEE_PAGE_XFETCH_BETA", "1.0"))
+# Stale-while-revalidate: soft-expired pages are served as-is while a Celery task rebuilds them.
+EMPLOYEE_PAGE_STALE_WHILE_REVALIDATE = os.getenv("EMPLOYEE_PAGE_STALE_WHILE_REVALIDATE", "true").lower() == "true"
+
+# Per-process cap on redis.asyncio connections used by the async views.
+EMPLOYEE_ASYNC_REDIS_MAX_CONNECTIONS = int(os.getenv("EMPLOYEE_ASYNC_REDIS_MAX_CONNECTIONS", "100"))
+
+# In-process L1 page cache in front of Redis; EMPLOYEE_L1_CACHE_MAX_BYTES=0 disables it.
+EMPLOYEE_L1_CACHE_MAX_BYTES = int(os.getenv("EMPLOYEE_L1_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMPLOYEE_L1_CACHE_TTL_SECONDS = float(os.getenv("EMPLOYEE_L1_CACHE_TTL_SECONDS", "30"))
+EMPLOYEE_L1_GENERATION_CHECK_SECONDS = float(os.getenv("EMPLOYEE_L1_GENERATION_CHECK_SECONDS", "1"))
+
+# Bulk cache warming streams rows once and writes EMPLOYEE_CACHE_PAGES_PER_FLUSH pages per Redis pipeline.
+EMPLOYEE_CACHE_BULK_WARM = os.getenv("EMPLOYEE_CACHE_BULK_WARM", "true").lower() == "true"
+EMPLOYEE_CACHE_PAGES_PER_FLUSH = int(os.getenv("EMPLOYEE_CACHE_PAGES_PER_FLUSH", "50"))
+# Above 1, a full refresh fans out as a chord of id-range shard tasks across the Celery workers.
+EMPLOYEE_CACHE_REFRESH_SHARDS = int(os.getenv("EMPLOYEE_CACHE_REFRESH_SHARDS", "1"))
 
 # CSRF trusted origins for Railway
 csrf_trusted = os.getenv("CSRF_TRUSTED_ORIGINS")
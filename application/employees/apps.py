@@ -8,6 +8,8 @@ class EmployeesConfig(AppConfig):
     name = "employees"
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         # Avoid duplicate startup actions caused by Django autoreload parent process.
         if settings.DEBUG and settings.__dict__.get("_resume_checked", False):
             return
@@ -0,0 +1,92 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.decorators import login_required
+from django.core import signing
+from django.http import HttpRequest, JsonResponse
+from django.utils.functional import SimpleLazyObject
+
+
+API_TOKEN_SALT = "employees.api-token"
+BEARER_PREFIX = "bearer "
+
+
+def issue_api_token(user) -> str:
+    # Stateless: the token carries the user id and is only checked against its signature and age,
+    # so a request that presents one touches neither django_session nor auth_user.
+    return signing.TimestampSigner(salt=API_TOKEN_SALT).sign_object({"uid": user.pk, "username": user.get_username()})
+
+
+def _bearer_token(request: HttpRequest) -> str | None:
+    authorization = request.headers.get("Authorization", "")
+    if authorization[: len(BEARER_PREFIX)].lower() != BEARER_PREFIX:
+        return None
+    return authorization[len(BEARER_PREFIX) :].strip()
+
+
+def authenticate_api_token(request: HttpRequest, token: str) -> bool:
+    try:
+        payload = signing.TimestampSigner(salt=API_TOKEN_SALT).unsign_object(
+            token, max_age=settings.API_TOKEN_MAX_AGE_SECONDS
+        )
+        user_id = payload["uid"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return False
+
+    # The user row is only loaded if a view actually looks at request.user, so deactivation only takes
+    # effect there; views that never load it keep serving the token until API_TOKEN_MAX_AGE_SECONDS.
+    users = get_user_model()._default_manager.filter(pk=user_id)
+    request.api_token_user_id = user_id
+    request.user = SimpleLazyObject(lambda: _active_user(users.first()))
+
+    async def auser():
+        return _active_user(await users.afirst())
+
+    request.auser = auser
+    return True
+
+
+def _active_user(user):
+    # A user deleted or deactivated after the token was issued is anonymous from then on.
+    if user is None or not user.is_active:
+        return AnonymousUser()
+    return user
+
+
+def _token_rejected() -> JsonResponse:
+    response = JsonResponse({"detail": "Invalid or expired API token."}, status=401)
+    response["WWW-Authenticate"] = 'Bearer realm="api"'
+    return response
+
+
+def api_login_required(view_func):
+    # Accepts `Authorization: Bearer <token>` from api_login_view/api_signup_view; requests without
+    # one fall back to the session cookie exactly like login_required.
+    session_view = login_required(view_func)
+
+    if iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def _view_wrapper(request, *args, **kwargs):
+            token = _bearer_token(request)
+            if token is None:
+                return await session_view(request, *args, **kwargs)
+            if not authenticate_api_token(request, token):
+                return _token_rejected()
+            return await view_func(request, *args, **kwargs)
+
+    else:
+
+        @wraps(view_func)
+        def _view_wrapper(request, *args, **kwargs):
+            token = _bearer_token(request)
+            if token is None:
+                return session_view(request, *args, **kwargs)
+            if not authenticate_api_token(request, token):
+                return _token_rejected()
+            return view_func(request, *args, **kwargs)
+
+    return _view_wrapper
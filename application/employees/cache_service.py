@@ -1,51 +1,638 @@
+import asyncio
+import gzip
+import math
+import random
+import threading
+import time
+import weakref
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from django.conf import settings
 from django.core.cache import cache
+from django.core.cache.backends.redis import RedisSerializer
+from redis import asyncio as redis_asyncio
+from redis.exceptions import LockError
+
+from config.pools import TimedAsyncBlockingConnectionPool
+
+from .count_service import EMPLOYEE_COUNT_CACHE_KEY
+from .filters import EmployeeQuery
+from .local_cache import LocalLRUCache
+from .repository import fetch_employee_page, fetch_filtered_employee_count, fetch_filtered_employee_page
+from .snapshot import get_employee_snapshot
 
-from .repository import fetch_employee_page
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 
 PAGE_SIZE = 1000
-EMPLOYEE_PAGE_CACHE_KEY_PREFIX = "employees:page"
-EMPLOYEE_CACHED_PAGES_KEY = "employees:cached_pages"
+EMPLOYEE_PAGE_CACHE_KEY_PREFIX = "employees:page_entry"
+EMPLOYEE_PAGE_BODY_CACHE_KEY_PREFIX = "employees:page_body"
+EMPLOYEE_PAGE_LOCK_KEY_PREFIX = "employees:page_lock"
+EMPLOYEE_ROWS_HTML_CACHE_KEY_PREFIX = "employees:rows_html"
+EMPLOYEE_FILTERED_PAGE_CACHE_KEY_PREFIX = "employees:filtered_page"
+EMPLOYEE_FILTERED_COUNT_CACHE_KEY_PREFIX = "employees:filtered_count"
+EMPLOYEE_CACHED_PAGES_KEY = "employees:cached_page_set"
+EMPLOYEE_DELETED_IDS_KEY = "employees:deleted_ids"
+EMPLOYEE_DELTA_WATERMARK_KEY = "employees:delta_refresh:watermark"
+EMPLOYEE_CACHE_GENERATION_KEY = "employees:generation"
+EMPLOYEE_DATASET_GENERATION_KEY = "employees:dataset_generation"
+EMPLOYEE_DATA_GENERATION_KEY = "employees:data_generation"
+EMPLOYEE_GENERATION_CHANGED_AT_KEY = "employees:generation_changed_at"
 CACHE_SOURCE_DB = "postgresql"
 CACHE_SOURCE_REDIS = "redis"
+CACHE_SOURCE_LOCAL = "memory"
+CACHE_SOURCE_SNAPSHOT = "snapshot"
+BODY_ENCODING_IDENTITY = "identity"
+BODY_ENCODING_GZIP = "gzip"
+BODY_ENCODING_BROTLI = "br"
+# Last-Modified has whole-second resolution, so each bump moves the stamp to max(now, previous + 1):
+# two bumps within one second must not leave a client's If-Modified-Since looking current.
+ADVANCE_CHANGED_AT_SCRIPT = """
+local changed_at = math.max(tonumber(ARGV[1]), tonumber(redis.call("GET", KEYS[1]) or "0") + 1)
+redis.call("SET", KEYS[1], changed_at)
+return changed_at
+"""
+# Cache OPTIONS that also apply to the redis.asyncio pool.
+ASYNC_REDIS_POOL_OPTIONS = ("timeout", "socket_timeout", "socket_connect_timeout", "health_check_interval")
+
+
+@dataclass
+class CachedPageBody:
+    body: bytes
+    encoding: str
+    total_count: int
+
+
+# L1: a per-process LRU in front of Redis (L2). Three counters live in Redis:
+# - EMPLOYEE_CACHE_GENERATION_KEY is bumped by any write that may leave L1 copies stale, cache
+#   refreshes included;
+# - EMPLOYEE_DATASET_GENERATION_KEY is bumped when the employees table is reloaded and namespaces
+#   every L2 page key, so a reload orphans the old pages instead of calling cache.clear();
+# - EMPLOYEE_DATA_GENERATION_KEY is bumped only when rows change (edits, deletes, reloads), so things
+#   derived from the rows themselves, like the columnar snapshot, survive a cache refresh.
+# All are polled together at most every EMPLOYEE_L1_GENERATION_CHECK_SECONDS, so hot L1 hits
+# normally skip the network entirely. EMPLOYEE_GENERATION_CHANGED_AT_KEY records when the data generation
+# last moved (whole seconds, strictly increasing per bump) and backs the Last-Modified header.
+_local_cache = LocalLRUCache(settings.EMPLOYEE_L1_CACHE_MAX_BYTES, settings.EMPLOYEE_L1_CACHE_TTL_SECONDS)
+_generation_lock = threading.Lock()
+_generation_state = {"generations": None, "data_generation": None, "changed_at": None, "checked_at": 0.0}
+_cache_stats: Counter = Counter()
+# redis.asyncio connections belong to the event loop that opened them, so each loop gets its own pool.
+_async_redis_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_redis_serializer = RedisSerializer()
 
 
 def _employee_page_cache_key(page: int) -> str:
-    return f"{EMPLOYEE_PAGE_CACHE_KEY_PREFIX}:{int(page)}"
+    return f"{EMPLOYEE_PAGE_CACHE_KEY_PREFIX}:{get_dataset_generation()}:{int(page)}"
+
+
+def _employee_page_body_cache_key(page: int, dataset_generation: int | None = None) -> str:
+    if dataset_generation is None:
+        dataset_generation = get_dataset_generation()
+    return f"{EMPLOYEE_PAGE_BODY_CACHE_KEY_PREFIX}:{dataset_generation}:{int(page)}"
+
+
+def _employee_page_lock_key(page: int) -> str:
+    return f"{EMPLOYEE_PAGE_LOCK_KEY_PREFIX}:{get_dataset_generation()}:{int(page)}"
+
+
+def _cached_pages_key() -> str:
+    return f"{EMPLOYEE_CACHED_PAGES_KEY}:{get_dataset_generation()}"
+
+
+def _filtered_cache_key(prefix: str, query: EmployeeQuery, suffix: str = "") -> str:
+    # The delta refresh cannot patch filtered results, so they are namespaced by the cache generation too,
+    # which every employee write and cache refresh bumps.
+    cache_generation, dataset_generation = _get_generations()
+    return f"{prefix}:{dataset_generation}.{cache_generation}:{query.cache_key()}{suffix}"
+
+
+def _get_redis_client():
+    return cache._cache.get_client(write=True)
+
+
+def _employee_rows_html_cache_key(page: int) -> str:
+    # Rendered rows change with any edit, so unlike page entries they are keyed by both generations.
+    cache_generation, dataset_generation = _get_generations()
+    return f"{EMPLOYEE_ROWS_HTML_CACHE_KEY_PREFIX}:{dataset_generation}.{cache_generation}:{int(page)}"
+
+
+def _get_async_redis_client() -> redis_asyncio.Redis:
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        # A blocking pool makes a burst of requests queue for a connection instead of failing.
+        cache_options = settings.CACHES["default"].get("OPTIONS", {})
+        pool = TimedAsyncBlockingConnectionPool.from_url(
+            settings.CACHES["default"]["LOCATION"],
+            max_connections=settings.EMPLOYEE_ASYNC_REDIS_MAX_CONNECTIONS,
+            **{option: cache_options[option] for option in ASYNC_REDIS_POOL_OPTIONS if option in cache_options},
+        )
+        client = _async_redis_clients[loop] = redis_asyncio.Redis(connection_pool=pool)
+    return client
+
+
+def _raw_cache_key(key: str) -> str:
+    return cache.make_and_validate_key(key)
+
+
+def _fresh_generations(now: float) -> tuple[int, int] | None:
+    with _generation_lock:
+        generations = _generation_state["generations"]
+        if generations is not None and now - _generation_state["checked_at"] < settings.EMPLOYEE_L1_GENERATION_CHECK_SECONDS:
+            return generations
+    return None
+
+
+def _store_generations(
+    latest: tuple[int, int], data_generation: int | bytes | None, changed_at: int | bytes | None, now: float
+) -> tuple[int, int]:
+    with _generation_lock:
+        if latest != _generation_state["generations"]:
+            _local_cache.clear()
+        _generation_state["generations"] = latest
+        _generation_state["data_generation"] = int(data_generation or 0)
+        _generation_state["changed_at"] = int(changed_at) if changed_at is not None else None
+        _generation_state["checked_at"] = now
+    return latest
+
+
+def _get_generations() -> tuple[int, int]:
+    now = time.monotonic()
+    generations = _fresh_generations(now)
+    if generations is not None:
+        return generations
+
+    cached = cache.get_many(
+        [
+            EMPLOYEE_CACHE_GENERATION_KEY,
+            EMPLOYEE_DATASET_GENERATION_KEY,
+            EMPLOYEE_DATA_GENERATION_KEY,
+            EMPLOYEE_GENERATION_CHANGED_AT_KEY,
+        ]
+    )
+    latest = (int(cached.get(EMPLOYEE_CACHE_GENERATION_KEY) or 0), int(cached.get(EMPLOYEE_DATASET_GENERATION_KEY) or 0))
+    return _store_generations(
+        latest, cached.get(EMPLOYEE_DATA_GENERATION_KEY), cached.get(EMPLOYEE_GENERATION_CHANGED_AT_KEY), now
+    )
+
+
+async def _aget_generations() -> tuple[int, int]:
+    now = time.monotonic()
+    generations = _fresh_generations(now)
+    if generations is not None:
+        return generations
+
+    cache_generation, dataset_generation, data_generation, changed_at = await _get_async_redis_client().mget(
+        [
+            _raw_cache_key(EMPLOYEE_CACHE_GENERATION_KEY),
+            _raw_cache_key(EMPLOYEE_DATASET_GENERATION_KEY),
+            _raw_cache_key(EMPLOYEE_DATA_GENERATION_KEY),
+            _raw_cache_key(EMPLOYEE_GENERATION_CHANGED_AT_KEY),
+        ]
+    )
+    return _store_generations(
+        (int(cache_generation or 0), int(dataset_generation or 0)), data_generation, changed_at, now
+    )
+
+
+def get_cache_generation() -> int:
+    return _get_generations()[0]
+
+
+def get_dataset_generation() -> int:
+    return _get_generations()[1]
+
+
+def get_data_generations() -> tuple[int, int]:
+    # (data generation, dataset generation) from a single poll: moves only when employee rows do.
+    _, dataset_generation = _get_generations()
+    with _generation_lock:
+        return _generation_state["data_generation"], dataset_generation
+
+
+def _data_version(generations: tuple[int, int]) -> tuple[int, int, int | None]:
+    with _generation_lock:
+        return _generation_state["data_generation"], generations[1], _generation_state["changed_at"]
+
+
+def get_employee_data_version() -> tuple[int, int, int | None]:
+    # (data generation, dataset generation, unix second of the last row change), from the same poll as L1.
+    # Cache refreshes move none of these, so they do not invalidate what clients already hold.
+    return _data_version(_get_generations())
+
+
+async def aget_employee_data_version() -> tuple[int, int, int | None]:
+    return _data_version(await _aget_generations())
+
+
+def _bump_generations(*keys: str) -> tuple[int, int]:
+    # Raw INCR creates a key when missing and stores a plain integer that cache.get() reads back.
+    pipeline = _get_redis_client().pipeline(transaction=True)
+    for key in keys:
+        pipeline.incr(_raw_cache_key(key))
+    if EMPLOYEE_DATA_GENERATION_KEY in keys:
+        pipeline.eval(ADVANCE_CHANGED_AT_SCRIPT, 1, _raw_cache_key(EMPLOYEE_GENERATION_CHANGED_AT_KEY), int(time.time()))
+    pipeline.mget(
+        [
+            _raw_cache_key(EMPLOYEE_CACHE_GENERATION_KEY),
+            _raw_cache_key(EMPLOYEE_DATASET_GENERATION_KEY),
+            _raw_cache_key(EMPLOYEE_DATA_GENERATION_KEY),
+            _raw_cache_key(EMPLOYEE_GENERATION_CHANGED_AT_KEY),
+        ]
+    )
+    cache_generation, dataset_generation, data_generation, changed_at = pipeline.execute()[-1]
+    changed_at = int(changed_at) if changed_at is not None else None
+    generations = (int(cache_generation or 0), int(dataset_generation or 0))
+    with _generation_lock:
+        _local_cache.clear()
+        _generation_state["generations"] = generations
+        _generation_state["data_generation"] = int(data_generation or 0)
+        _generation_state["changed_at"] = changed_at
+        _generation_state["checked_at"] = time.monotonic()
+    return generations
+
+
+def bump_cache_generation() -> int:
+    # Cache rewrites only: L1 copies are dropped, but nothing derived from the rows is invalidated.
+    return _bump_generations(EMPLOYEE_CACHE_GENERATION_KEY)[0]
+
+
+def bump_data_generation() -> None:
+    # Employee rows changed: drops L1 like bump_cache_generation() and also retires the snapshot.
+    _bump_generations(EMPLOYEE_CACHE_GENERATION_KEY, EMPLOYEE_DATA_GENERATION_KEY)
+
+
+def bump_dataset_generation() -> int:
+    # Called after a reload: every page key moves to a fresh namespace and the old ones age out via their TTL.
+    dataset_generation = _bump_generations(
+        EMPLOYEE_CACHE_GENERATION_KEY, EMPLOYEE_DATASET_GENERATION_KEY, EMPLOYEE_DATA_GENERATION_KEY
+    )[1]
+    _get_redis_client().delete(_raw_cache_key(EMPLOYEE_DELETED_IDS_KEY))
+    return dataset_generation
+
+
+def _local_get(key: str):
+    if _local_cache.max_bytes == 0:
+        return None
+    _get_generations()
+    return _local_lookup(key)
+
+
+def _local_lookup(key: str):
+    # Callers have already polled the generations, so a stale L1 has been cleared.
+    if _local_cache.max_bytes == 0:
+        return None
+    value = _local_cache.get(key)
+    _cache_stats["l1_hits" if value is not None else "l1_misses"] += 1
+    return value
+
+
+def _local_set(key: str, value, size: int | None = None) -> None:
+    if _local_cache.max_bytes:
+        _local_cache.set(key, value, size=size)
+
+
+def get_cache_stats() -> dict:
+    return {
+        "l1_hits": _cache_stats["l1_hits"],
+        "l1_misses": _cache_stats["l1_misses"],
+        "l2_hits": _cache_stats["l2_hits"],
+        "l2_misses": _cache_stats["l2_misses"],
+        "l1_entries": len(_local_cache),
+        "l1_size_bytes": _local_cache.size_bytes,
+        "l1_max_bytes": _local_cache.max_bytes,
+    }
+
+
+def _mark_pages_as_cached(pages: Iterable[int]) -> None:
+    # The page index is a Redis SET, so marking pages is one SADD instead of a read-modify-write.
+    pages = [int(page) for page in pages]
+    if pages:
+        pipeline = _get_redis_client().pipeline(transaction=False)
+        pipeline.sadd(_raw_cache_key(_cached_pages_key()), *pages)
+        pipeline.expire(_raw_cache_key(_cached_pages_key()), _warmed_page_timeout())
+        pipeline.execute()
+
+
+def get_cached_page_numbers() -> list[int]:
+    members = _get_redis_client().smembers(_raw_cache_key(_cached_pages_key()))
+    return sorted(int(member) for member in members)
+
+
+def _page_body_encoding() -> str:
+    encoding = settings.EMPLOYEE_PAGE_BODY_ENCODING
+    if encoding == BODY_ENCODING_BROTLI and brotli is None:
+        return BODY_ENCODING_GZIP
+    if encoding not in (BODY_ENCODING_GZIP, BODY_ENCODING_BROTLI):
+        return BODY_ENCODING_IDENTITY
+    return encoding
 
 
-def _mark_page_as_cached(page: int) -> None:
-    cached_pages = cache.get(EMPLOYEE_CACHED_PAGES_KEY) or []
-    page_set = set(cached_pages)
-    page_set.add(int(page))
-    cache.set(EMPLOYEE_CACHED_PAGES_KEY, sorted(page_set))
+def _compress_page_body(body: bytes, encoding: str) -> bytes:
+    if encoding == BODY_ENCODING_GZIP:
+        return gzip.compress(body, compresslevel=6)
+    if encoding == BODY_ENCODING_BROTLI:
+        return brotli.compress(body, quality=5)
+    return body
+
+
+def decompress_page_body(cached_body: CachedPageBody) -> bytes:
+    if cached_body.encoding == BODY_ENCODING_GZIP:
+        return gzip.decompress(cached_body.body)
+    if cached_body.encoding == BODY_ENCODING_BROTLI:
+        return brotli.decompress(cached_body.body)
+    return cached_body.body
+
+
+def _page_timeout() -> int:
+    # Redis keeps a page for a grace period past its soft expiry so a stale copy can be served while it is rebuilt.
+    return settings.EMPLOYEE_PAGE_SOFT_TTL_SECONDS + settings.EMPLOYEE_PAGE_STALE_GRACE_SECONDS
+
+
+def _warmed_page_timeout() -> int:
+    # Offset pages, their bodies and the cached-page set are only rewarmed every EMPLOYEE_FULL_REFRESH_SECONDS;
+    # the delta refresh rewrites changed ones in between. Keeping them until the next rewarm stops unchanged
+    # pages from going cold between runs, and the soft TTL still triggers background revalidation.
+    return max(_page_timeout(), settings.EMPLOYEE_FULL_REFRESH_SECONDS + settings.EMPLOYEE_PAGE_STALE_GRACE_SECONDS)
+
+
+def _page_entry(employee_data: list[dict], compute_seconds: float) -> dict:
+    return {
+        "data": employee_data,
+        "expires_at": time.time() + settings.EMPLOYEE_PAGE_SOFT_TTL_SECONDS,
+        "compute_seconds": float(compute_seconds),
+    }
+
+
+def _needs_recompute(entry: dict) -> bool:
+    # Probabilistic early expiration (XFetch): the closer to expires_at and the slower the page
+    # was to build, the likelier one reader volunteers to rebuild it before it actually expires.
+    jitter = entry["compute_seconds"] * settings.EMPLOYEE_PAGE_XFETCH_BETA * -math.log(1.0 - random.random())
+    return time.time() + jitter >= entry["expires_at"]
+
+
+def _page_lock(page: int):
+    return _get_redis_client().lock(
+        _raw_cache_key(_employee_page_lock_key(page)),
+        timeout=settings.EMPLOYEE_PAGE_LOCK_TIMEOUT_SECONDS,
+    )
+
+
+def _acquire_page_lock(page: int):
+    lock = _page_lock(page)
+    return lock if lock.acquire(blocking=False) else None
+
+
+def _release_page_lock(lock) -> None:
+    try:
+        lock.release()
+    except LockError:
+        # The lock expired while the page was rebuilt; another reader may already hold it.
+        pass
+
+
+def _recompute_page(page: int, page_size: int) -> list[dict]:
+    started = time.perf_counter()
+    employee_data = fetch_employee_page(page, page_size)
+    cache_key = _employee_page_cache_key(page)
+    cache.set(cache_key, _page_entry(employee_data, time.perf_counter() - started), timeout=_warmed_page_timeout())
+    _mark_pages_as_cached([page])
+    _local_set(cache_key, employee_data)
+    return employee_data
+
+
+def _revalidate_page_in_background(page: int, page_size: int) -> None:
+    # The lock marks a refresh as in flight; the task gets its token so refresh_cached_page() releases
+    # exactly this lock once the page is rebuilt, never one a later reader took after it expired.
+    lock = _acquire_page_lock(page)
+    if lock is None:
+        return
+
+    from .tasks import refresh_employee_page
+
+    try:
+        refresh_employee_page.delay(page, page_size, lock.local.token.decode("ascii"))
+    except Exception:
+        # Broker unavailable: keep serving the stale copy and let a later request retry.
+        _release_page_lock(lock)
+
+
+def refresh_cached_page(page: int, page_size: int = PAGE_SIZE, lock_token: str | None = None) -> list[dict]:
+    try:
+        employee_data = _recompute_page(page, page_size)
+        cache.delete(_employee_page_body_cache_key(page))
+    finally:
+        if lock_token is not None:
+            lock = _page_lock(page)
+            lock.local.token = lock_token.encode("ascii")
+            _release_page_lock(lock)
+    return employee_data
+
+
+def _wait_for_page(cache_key: str) -> list[dict] | None:
+    deadline = time.monotonic() + settings.EMPLOYEE_PAGE_LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry["data"]
+    return None
 
 
 def get_employees_for_display(page: int, page_size: int = PAGE_SIZE) -> tuple[list[dict], str]:
     cache_key = _employee_page_cache_key(page)
-    cached_payload = cache.get(cache_key)
-    if cached_payload is not None:
-        return cached_payload, CACHE_SOURCE_REDIS
+    local_payload = _local_get(cache_key)
+    if local_payload is not None:
+        return local_payload, CACHE_SOURCE_LOCAL
+
+    entry = cache.get(cache_key)
+    _cache_stats["l2_hits" if entry is not None else "l2_misses"] += 1
+    if entry is not None and not _needs_recompute(entry):
+        _local_set(cache_key, entry["data"])
+        return entry["data"], CACHE_SOURCE_REDIS
+
+    if entry is not None and settings.EMPLOYEE_PAGE_STALE_WHILE_REVALIDATE:
+        _revalidate_page_in_background(page, page_size)
+        return entry["data"], CACHE_SOURCE_REDIS
+
+    # Single flight: one request per page rebuilds it; the rest serve the stale copy or wait for the rebuild.
+    lock = _acquire_page_lock(page)
+    if lock is not None:
+        try:
+            return _recompute_page(page, page_size), CACHE_SOURCE_DB
+        finally:
+            _release_page_lock(lock)
+
+    if entry is not None:
+        return entry["data"], CACHE_SOURCE_REDIS
+
+    employee_data = _wait_for_page(cache_key)
+    if employee_data is not None:
+        return employee_data, CACHE_SOURCE_REDIS
+    return fetch_employee_page(page, page_size), CACHE_SOURCE_DB
 
-    employee_data = fetch_employee_page(page, page_size)
-    cache.set(cache_key, employee_data)
-    _mark_page_as_cached(page)
-    return employee_data, CACHE_SOURCE_DB
 
+def get_filtered_employee_count(query: EmployeeQuery) -> int:
+    cache_key = _filtered_cache_key(EMPLOYEE_FILTERED_COUNT_CACHE_KEY_PREFIX, query)
+    total_count = cache.get(cache_key)
+    if total_count is None:
+        snapshot = get_employee_snapshot(*get_data_generations())
+        total_count = snapshot.count(query) if snapshot is not None else fetch_filtered_employee_count(query)
+        cache.set(cache_key, total_count, timeout=_page_timeout())
+    return int(total_count)
 
-def cache_page_if_missing(page: int, employee_data: list[dict]) -> bool:
+
+def get_filtered_employees_for_display(
+    query: EmployeeQuery, page: int, page_size: int = PAGE_SIZE
+) -> tuple[list[dict], str]:
+    cache_key = _filtered_cache_key(EMPLOYEE_FILTERED_PAGE_CACHE_KEY_PREFIX, query, f":{int(page_size)}:{int(page)}")
+    local_payload = _local_get(cache_key)
+    if local_payload is not None:
+        return local_payload, CACHE_SOURCE_LOCAL
+
+    employee_data = cache.get(cache_key)
+    _cache_stats["l2_hits" if employee_data is not None else "l2_misses"] += 1
+    if employee_data is not None:
+        _local_set(cache_key, employee_data)
+        return employee_data, CACHE_SOURCE_REDIS
+
+    # The columnar snapshot answers filters without touching PostgreSQL when it matches the current data.
+    snapshot = get_employee_snapshot(*get_data_generations())
+    if snapshot is not None:
+        employee_data, source = snapshot.page(query, page, page_size), CACHE_SOURCE_SNAPSHOT
+    else:
+        employee_data, source = fetch_filtered_employee_page(query, page, page_size), CACHE_SOURCE_DB
+    cache.set(cache_key, employee_data, timeout=_page_timeout())
+    _local_set(cache_key, employee_data)
+    return employee_data, source
+
+
+def cache_page_if_missing(page: int, employee_data: list[dict], compute_seconds: float = 0.0) -> bool:
     cache_key = _employee_page_cache_key(page)
-    inserted = cache.add(cache_key, employee_data)
-    _mark_page_as_cached(page)
+    inserted = cache.add(cache_key, _page_entry(employee_data, compute_seconds), timeout=_warmed_page_timeout())
+    if inserted:
+        # A body built from an older copy of this page must not outlive it.
+        cache.delete(_employee_page_body_cache_key(page))
+    _mark_pages_as_cached([page])
     return bool(inserted)
 
 
+def cache_pages(pages: dict[int, list[dict]], compute_seconds: float = 0.0) -> None:
+    if not pages:
+        return
+    # set_many is a single pipelined round trip on the Redis backend.
+    cache.set_many(
+        {
+            _employee_page_cache_key(page): _page_entry(employee_data, compute_seconds)
+            for page, employee_data in pages.items()
+        },
+        timeout=_warmed_page_timeout(),
+    )
+    pipeline = _get_redis_client().pipeline(transaction=False)
+    pipeline.delete(*[_raw_cache_key(_employee_page_body_cache_key(page)) for page in pages])
+    pipeline.sadd(_raw_cache_key(_cached_pages_key()), *[int(page) for page in pages])
+    pipeline.expire(_raw_cache_key(_cached_pages_key()), _warmed_page_timeout())
+    pipeline.execute()
+
+
+def cache_page_body(page: int, body: bytes, total_count: int) -> CachedPageBody:
+    encoding = _page_body_encoding()
+    cached_body = CachedPageBody(
+        body=_compress_page_body(body, encoding),
+        encoding=encoding,
+        total_count=int(total_count),
+    )
+    body_key = _employee_page_body_cache_key(page)
+    # Never outlives the page entry it was rendered from.
+    cache.set(body_key, asdict(cached_body), timeout=_warmed_page_timeout())
+    _local_set(body_key, cached_body, size=len(cached_body.body))
+    return cached_body
+
+
+def _load_page_body(entry: dict) -> CachedPageBody:
+    # Bodies stored by older releases still carry an unused "etag" field.
+    return CachedPageBody(body=entry["body"], encoding=entry["encoding"], total_count=entry["total_count"])
+
+
+def invalidate_page_bodies(pages: Iterable[int]) -> None:
+    # A body can still be cached after its page entry expired, so changed pages drop theirs either way.
+    keys = [_employee_page_body_cache_key(page) for page in pages]
+    if keys:
+        cache.delete_many(keys)
+
+
+def get_cached_page_body(page: int) -> CachedPageBody | None:
+    # The body embeds the total count, so it is only served while that count is still current.
+    # L1 copies need no count check: anything that changes the count also bumps the generation.
+    body_key = _employee_page_body_cache_key(page)
+    local_body = _local_get(body_key)
+    if local_body is not None:
+        return local_body
+
+    cached = cache.get_many([body_key, EMPLOYEE_COUNT_CACHE_KEY])
+    entry = cached.get(body_key)
+    if entry is None or cached.get(EMPLOYEE_COUNT_CACHE_KEY) != entry["total_count"]:
+        _cache_stats["l2_misses"] += 1
+        return None
+    _cache_stats["l2_hits"] += 1
+    cached_body = _load_page_body(entry)
+    _local_set(body_key, cached_body, size=len(cached_body.body))
+    return cached_body
+
+
+async def aget_cached_page_body(page: int) -> CachedPageBody | None:
+    # get_cached_page_body() for the event loop: the generation poll and the L2 read go through
+    # redis.asyncio, so a request waiting on Redis holds no thread.
+    _, dataset_generation = await _aget_generations()
+    body_key = _employee_page_body_cache_key(page, dataset_generation)
+    local_body = _local_lookup(body_key)
+    if local_body is not None:
+        return local_body
+
+    values = await _get_async_redis_client().mget([_raw_cache_key(body_key), _raw_cache_key(EMPLOYEE_COUNT_CACHE_KEY)])
+    entry, total_count = (None if value is None else _redis_serializer.loads(value) for value in values)
+    if entry is None or total_count != entry["total_count"]:
+        _cache_stats["l2_misses"] += 1
+        return None
+    _cache_stats["l2_hits"] += 1
+    cached_body = _load_page_body(entry)
+    _local_set(body_key, cached_body, size=len(cached_body.body))
+    return cached_body
+
+
+def cache_employee_rows_html(page: int, html: str) -> None:
+    cache_key = _employee_rows_html_cache_key(page)
+    cache.set(cache_key, html, timeout=_page_timeout())
+    _local_set(cache_key, html, size=len(html))
+
+
+def get_cached_employee_rows_html(page: int) -> str | None:
+    cache_key = _employee_rows_html_cache_key(page)
+    html = _local_get(cache_key)
+    if html is not None:
+        return html
+    html = cache.get(cache_key)
+    _cache_stats["l2_hits" if html is not None else "l2_misses"] += 1
+    if html is not None:
+        _local_set(cache_key, html, size=len(html))
+    return html
+
+
 def clear_employee_page_cache() -> None:
-    cached_pages = cache.get(EMPLOYEE_CACHED_PAGES_KEY) or []
+    cached_pages = get_cached_page_numbers()
     keys = [_employee_page_cache_key(page) for page in cached_pages]
+    keys += [_employee_page_body_cache_key(page) for page in cached_pages]
     if keys:
         cache.delete_many(keys)
-    cache.delete(EMPLOYEE_CACHED_PAGES_KEY)
+    cache.delete(_cached_pages_key())
+    bump_cache_generation()
 
 
 def has_cached_page(page: int) -> bool:
@@ -54,4 +641,26 @@ def has_cached_page(page: int) -> bool:
 
 
 def get_cached_page(page: int) -> list[dict] | None:
-    return cache.get(_employee_page_cache_key(page))
+    entry = cache.get(_employee_page_cache_key(page))
+    return entry["data"] if entry is not None else None
+
+
+def record_deleted_employee(employee_id: int) -> None:
+    # Deleting a row shifts every later offset page, so the delta refresh needs to know where.
+    _get_redis_client().sadd(_raw_cache_key(EMPLOYEE_DELETED_IDS_KEY), int(employee_id))
+
+
+def pop_deleted_employee_ids() -> list[int]:
+    pipeline = _get_redis_client().pipeline(transaction=True)
+    pipeline.smembers(_raw_cache_key(EMPLOYEE_DELETED_IDS_KEY))
+    pipeline.delete(_raw_cache_key(EMPLOYEE_DELETED_IDS_KEY))
+    members, _ = pipeline.execute()
+    return sorted(int(member) for member in members)
+
+
+def get_delta_watermark() -> datetime | None:
+    return cache.get(EMPLOYEE_DELTA_WATERMARK_KEY)
+
+
+def set_delta_watermark(watermark: datetime) -> None:
+    cache.set(EMPLOYEE_DELTA_WATERMARK_KEY, watermark, timeout=None)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .repository import fetch_employee_count, fetch_employee_count_estimate
+
+
+EMPLOYEE_COUNT_CACHE_KEY = "employees:count"
+EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY = "employees:count:estimate"
+
+
+def get_employee_count(estimate: bool = False) -> int:
+    if not estimate:
+        total_count = cache.get(EMPLOYEE_COUNT_CACHE_KEY)
+        if total_count is not None:
+            return int(total_count)
+        return refresh_employee_count()
+
+    # Prefer the exact count whenever it is already cached; both keys are read in one round trip.
+    cached = cache.get_many([EMPLOYEE_COUNT_CACHE_KEY, EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY])
+    if EMPLOYEE_COUNT_CACHE_KEY in cached:
+        return int(cached[EMPLOYEE_COUNT_CACHE_KEY])
+    if EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY in cached:
+        return int(cached[EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY])
+
+    estimated_count = fetch_employee_count_estimate()
+    cache.set(
+        EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY,
+        estimated_count,
+        timeout=settings.EMPLOYEE_COUNT_ESTIMATE_TIMEOUT_SECONDS,
+    )
+    return estimated_count
+
+
+def set_employee_count(total_count: int) -> None:
+    # The exact count never expires; it is kept current by signals and the refresh task.
+    cache.set(EMPLOYEE_COUNT_CACHE_KEY, int(total_count), timeout=None)
+    cache.delete(EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY)
+
+
+def refresh_employee_count() -> int:
+    total_count = fetch_employee_count()
+    set_employee_count(total_count)
+    return total_count
+
+
+def adjust_employee_count(delta: int) -> None:
+    try:
+        cache.incr(EMPLOYEE_COUNT_CACHE_KEY, int(delta))
+    except ValueError:
+        # Nothing cached yet; the next read recounts from PostgreSQL.
+        pass
+
+
+def invalidate_employee_count() -> None:
+    cache.delete_many([EMPLOYEE_COUNT_CACHE_KEY, EMPLOYEE_COUNT_ESTIMATE_CACHE_KEY])
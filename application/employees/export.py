@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator, Iterable, Iterator
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .models import Employee
+from .repository import EMPLOYEE_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_CONTENT_TYPES = {
+    EXPORT_FORMAT_CSV: "text/csv; charset=utf-8",
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+    EXPORT_FORMAT_PARQUET: "application/vnd.apache.parquet",
+}
+EXPORT_CHUNK_ROWS = 5000
+PARQUET_ROW_GROUP_ROWS = 100_000
+# wbits=31 makes zlib emit a gzip header and trailer.
+GZIP_WBITS = 31
+
+
+def export_format_available(export_format: str) -> bool:
+    return export_format in EXPORT_CONTENT_TYPES and (export_format != EXPORT_FORMAT_PARQUET or pq is not None)
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def iter_csv_export(rows: Iterable[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EMPLOYEE_FIELDS)
+    for chunk in _chunks(rows, EXPORT_CHUNK_ROWS):
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: the table is empty.
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson_export(rows: Iterable[tuple]) -> Iterator[bytes]:
+    encoder = json.JSONEncoder(separators=(",", ":"))
+    for chunk in _chunks(rows, EXPORT_CHUNK_ROWS):
+        yield "".join(f"{encoder.encode(dict(zip(EMPLOYEE_FIELDS, row)))}\n" for row in chunk).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    # Write-only file object for ParquetWriter; the bytes written so far are handed out and dropped
+    # after every row group, so only one row group is ever held in memory.
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_schema():
+    return pa.schema(
+        [
+            (field, pa.string() if Employee._meta.get_field(field).get_internal_type() == "CharField" else pa.int64())
+            for field in EMPLOYEE_FIELDS
+        ]
+    )
+
+
+def iter_parquet_export(rows: Iterable[tuple]) -> Iterator[bytes]:
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for chunk in _chunks(rows, PARQUET_ROW_GROUP_ROWS):
+        columns = [pa.array(values, type=column.type) for values, column in zip(zip(*chunk), schema)]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        if data := sink.drain():
+            yield data
+    # The footer is only written on close.
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    EXPORT_FORMAT_CSV: iter_csv_export,
+    EXPORT_FORMAT_NDJSON: iter_ndjson_export,
+    EXPORT_FORMAT_PARQUET: iter_parquet_export,
+}
+
+
+def iter_employee_export(rows: Iterable[tuple], export_format: str) -> Iterator[bytes]:
+    return EXPORT_WRITERS[export_format](rows)
+
+
+async def async_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    # Under ASGI, StreamingHttpResponse would list() a sync iterator in one go before sending anything.
+    # Each chunk is pulled on the thread-sensitive executor instead, the same thread that holds the
+    # server-side cursor, so the export keeps streaming with flat memory.
+    pull = sync_to_async(next)
+    try:
+        while (chunk := await pull(chunks, None)) is not None:
+            yield chunk
+    finally:
+        if close := getattr(chunks, "close", None):
+            await sync_to_async(close)()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,85 @@
+import hashlib
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from django.http import QueryDict
+
+
+# Query parameter -> converter. Each parameter may repeat or hold comma-separated values (OR within a field).
+FILTER_FIELDS: dict[str, Callable[[str], Any]] = {
+    "city": str,
+    "education": str,
+    "payment_tier": int,
+    "joining_year": int,
+    "leave_or_not": int,
+}
+SORT_FIELDS = ("id", "joining_year", "payment_tier", "age", "experience_in_current_domain", "city", "education")
+DEFAULT_SORT = "id"
+MAX_FILTER_VALUES = 50
+
+
+class EmployeeQueryError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class EmployeeQuery:
+    # Normalized: fields in a fixed order, values de-duplicated and sorted, so equivalent URLs share a cache key.
+    filters: tuple[tuple[str, tuple], ...] = ()
+    sort: str = DEFAULT_SORT
+
+    @property
+    def is_default(self) -> bool:
+        return not self.filters and self.sort == DEFAULT_SORT
+
+    @property
+    def supports_cursor(self) -> bool:
+        # Cursors are keyset positions on id, so they only line up with id ordering.
+        return self.sort == DEFAULT_SORT
+
+    def ordering(self) -> list[str]:
+        if self.sort.lstrip("-") == "id":
+            return [self.sort]
+        # id breaks ties so offset pages stay stable.
+        return [self.sort, "-id" if self.sort.startswith("-") else "id"]
+
+    def lookups(self) -> dict[str, Any]:
+        return {f"{field}__in": list(values) for field, values in self.filters}
+
+    def as_params(self) -> dict[str, list]:
+        return {field: list(values) for field, values in self.filters}
+
+    def cache_key(self) -> str:
+        canonical = "&".join(f"{field}={','.join(map(str, values))}" for field, values in self.filters)
+        return hashlib.blake2b(f"{canonical}|sort={self.sort}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+DEFAULT_EMPLOYEE_QUERY = EmployeeQuery()
+
+
+def _query_values(params: Mapping, name: str) -> list[str]:
+    raw_values = params.getlist(name) if isinstance(params, QueryDict) else [params[name]]
+    return [value.strip() for raw in raw_values for value in raw.split(",") if value.strip()]
+
+
+def parse_employee_query(params: Mapping) -> EmployeeQuery:
+    filters = []
+    for field, convert in FILTER_FIELDS.items():
+        if field not in params:
+            continue
+        values = _query_values(params, field)
+        if not values:
+            raise EmployeeQueryError(f"Filter {field!r} needs at least one value.")
+        if len(values) > MAX_FILTER_VALUES:
+            raise EmployeeQueryError(f"Filter {field!r} accepts at most {MAX_FILTER_VALUES} values.")
+        try:
+            converted = sorted({convert(value) for value in values})
+        except ValueError:
+            raise EmployeeQueryError(f"Filter {field!r} expects {convert.__name__} values.")
+        filters.append((field, tuple(converted)))
+
+    sort = params.get("sort", DEFAULT_SORT).strip() or DEFAULT_SORT
+    if sort.lstrip("-") not in SORT_FIELDS:
+        raise EmployeeQueryError(f"Unknown sort {sort!r}; use one of {', '.join(SORT_FIELDS)} (prefix - for descending).")
+    return EmployeeQuery(filters=tuple(filters), sort=sort)
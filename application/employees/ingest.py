@@ -0,0 +1,256 @@
+import csv
+import io
+import os
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+from .models import Employee
+from .progress_tracker import get_progress_tracker
+from .stats_service import EmployeeStatsAccumulator
+from .table_swap import read_staging_progress, record_staging_progress
+
+
+COPY_RENDER_CHUNK_ROWS = 5000
+COPY_WRITE_CHARS = 1024 * 1024
+IMPORT_JOB_NAME = "employee_csv_import"
+DEFAULT_IMPORT_BATCH_ROWS = 100_000
+
+
+class CsvValidationError(ValueError):
+    pass
+
+
+def _text(field_name: str) -> Callable[[str], str]:
+    max_length = Employee._meta.get_field(field_name).max_length
+
+    def convert(value: str) -> str:
+        value = value.strip()
+        if len(value) > max_length:
+            raise ValueError(f"{field_name} longer than {max_length} characters: {value!r}")
+        return value
+
+    return convert
+
+
+# (CSV header, employees column, converter) in COPY column order.
+CSV_COLUMNS: tuple[tuple[str, str, Callable[[str], Any]], ...] = (
+    ("Education", "education", _text("education")),
+    ("JoiningYear", "joining_year", int),
+    ("City", "city", _text("city")),
+    ("PaymentTier", "payment_tier", int),
+    ("Age", "age", int),
+    ("Gender", "gender", _text("gender")),
+    ("EverBenched", "ever_benched", _text("ever_benched")),
+    ("ExperienceInCurrentDomain", "experience_in_current_domain", int),
+    ("LeaveOrNot", "leave_or_not", int),
+)
+REQUIRED_CSV_HEADERS = {header for header, _, _ in CSV_COLUMNS}
+COPY_COLUMNS = tuple(column for _, column, _ in CSV_COLUMNS)
+
+
+def convert_csv_row(row: dict[str, str], location: str) -> tuple:
+    try:
+        return tuple(convert(row[header]) for header, _, convert in CSV_COLUMNS)
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise CsvValidationError(f"Invalid CSV row at {location}: {exc}") from exc
+
+
+def _check_headers(fieldnames: Iterable[str] | None) -> None:
+    missing = REQUIRED_CSV_HEADERS.difference(fieldnames or [])
+    if missing:
+        raise CsvValidationError(f"CSV missing required columns: {sorted(missing)}")
+
+
+def iter_csv_employee_rows(reader: csv.DictReader) -> Iterator[tuple]:
+    _check_headers(reader.fieldnames)
+    for row in reader:
+        yield convert_csv_row(row, f"line {reader.line_num}")
+
+
+def split_csv_byte_ranges(csv_path: Path, parts: int) -> tuple[list[str], list[tuple[int, int]]]:
+    # Byte ranges are cut blindly; iter_csv_range_rows() assigns each line to the range its first byte
+    # falls in. This assumes no quoted field spans several lines, which holds for Employee.csv.
+    with Path(csv_path).open("rb") as fp:
+        header_line = fp.readline()
+        data_start = fp.tell()
+        file_size = os.fstat(fp.fileno()).st_size
+    fieldnames = next(csv.reader([header_line.decode("utf-8")]), [])
+    _check_headers(fieldnames)
+
+    data_size = file_size - data_start
+    if data_size <= 0:
+        # Header only: nothing to read, so no range and no worker.
+        return fieldnames, []
+    # Never more parts than data bytes, so every range starts before EOF.
+    parts = min(max(int(parts), 1), data_size)
+    step = data_size // parts
+    bounds = [data_start + step * index for index in range(parts)] + [file_size]
+    return fieldnames, list(zip(bounds, bounds[1:]))
+
+
+def import_part_job_name(part: int) -> str:
+    return f"{IMPORT_JOB_NAME}:part:{part}"
+
+
+class CsvRangeReader:
+    # Reads the lines that start inside [start, end). offset always points at the next unread line,
+    # so it can be checkpointed and later passed back in as start.
+    def __init__(self, csv_path: Path, fieldnames: list[str], start: int, end: int):
+        self.fieldnames = fieldnames
+        self.end = end
+        self._fp = Path(csv_path).open("rb")
+        # Step back one byte so a range starting exactly on a line boundary keeps that line.
+        self._fp.seek(start - 1)
+        self._fp.readline()
+        self.offset = self._fp.tell()
+        self.exhausted = self.offset >= end
+
+    def rows(self, limit: int | None = None) -> Iterator[tuple]:
+        yielded = 0
+        while not self.exhausted and (limit is None or yielded < limit):
+            line_offset = self.offset
+            line = self._fp.readline()
+            self.offset = self._fp.tell()
+            self.exhausted = not line or self.offset >= self.end
+            values = next(csv.reader([line.decode("utf-8")]), None) if line else None
+            if not values:
+                continue
+            # zip() would silently drop the missing columns of a truncated line.
+            if len(values) != len(self.fieldnames):
+                raise CsvValidationError(
+                    f"Invalid CSV row at byte offset {line_offset}: "
+                    f"expected {len(self.fieldnames)} fields, got {len(values)}"
+                )
+            yielded += 1
+            yield convert_csv_row(dict(zip(self.fieldnames, values)), f"byte offset {line_offset}")
+
+    def close(self) -> None:
+        self._fp.close()
+
+    def __enter__(self) -> "CsvRangeReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_csv_range_rows(csv_path: Path, fieldnames: list[str], start: int, end: int) -> Iterator[tuple]:
+    with CsvRangeReader(csv_path, fieldnames, start, end) as reader:
+        yield from reader.rows()
+
+
+def load_csv_range(
+    csv_path: str,
+    fieldnames: list[str],
+    start: int,
+    end: int,
+    table: str,
+    part: int = 0,
+    batch_rows: int = DEFAULT_IMPORT_BATCH_ROWS,
+) -> int:
+    # Process-pool entry point: every worker parses its own byte range and COPYs it over its own connection.
+    # Each batch commits together with its checkpoint row, so a rerun continues after the last committed batch.
+    tracker = get_progress_tracker()
+    job_name = import_part_job_name(part)
+    try:
+        next_offset, loaded_count, raw_stats = read_staging_progress().get(part, (start, 0, {}))
+        # Stats ride along in the checkpoint, so a resumed range still contributes exact totals.
+        stats = EmployeeStatsAccumulator.from_raw(raw_stats)
+        with CsvRangeReader(Path(csv_path), fieldnames, next_offset, end) as reader:
+            while not reader.exhausted:
+                with transaction.atomic():
+                    rows = stats.track(reader.rows(max(int(batch_rows), 1)), COPY_COLUMNS)
+                    loaded_count += copy_employee_rows(rows, table=table)
+                    record_staging_progress(part, reader.offset, loaded_count, stats.to_raw())
+                tracker.write(job_name, "CHECKPOINT", checkpoint=loaded_count, offset=reader.offset, end=end)
+        tracker.write(job_name, "COMPLETED", checkpoint=loaded_count, offset=end, end=end)
+        return loaded_count
+    finally:
+        connection.close()
+
+
+def copy_csv_range(csv_path: str, fieldnames: list[str], start: int, end: int, table: str) -> int:
+    # Benchmark counterpart of load_csv_range(): one transaction per range, no checkpoints or tracker events.
+    try:
+        with transaction.atomic():
+            return copy_employee_rows(iter_csv_range_rows(Path(csv_path), fieldnames, start, end), table=table)
+    finally:
+        connection.close()
+
+
+def count_csv_range_rows(csv_path: str, fieldnames: list[str], start: int, end: int) -> int:
+    # Parse-and-validate only; used to benchmark the CPU-bound half of the pipeline.
+    return sum(1 for _ in iter_csv_range_rows(Path(csv_path), fieldnames, start, end))
+
+
+class CsvCopyStream:
+    # File-like object for cursor.copy_expert(): rows are rendered to CSV a chunk at a time as
+    # COPY reads, so memory stays bounded no matter how large the input is.
+    # psycopg2 replaces any exception raised from read() with QueryCanceled, so a validation error is
+    # kept in `error` for copy_employee_rows() to re-raise.
+    def __init__(self, rows: Iterable[tuple], chunk_rows: int = COPY_RENDER_CHUNK_ROWS):
+        self.row_count = 0
+        self.error: CsvValidationError | None = None
+        self._rows = iter(rows)
+        self._chunk_rows = max(int(chunk_rows), 1)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+        self._offset = 0
+
+    def read(self, size: int = -1) -> str:
+        remaining = size if size >= 0 else float("inf")
+        parts = []
+        while remaining > 0:
+            if self._offset >= len(self._pending):
+                self._pending = self._render_chunk()
+                self._offset = 0
+                if not self._pending:
+                    break
+            part = self._pending[self._offset : self._offset + remaining] if size >= 0 else self._pending[self._offset :]
+            self._offset += len(part)
+            remaining -= len(part)
+            parts.append(part)
+        return "".join(parts)
+
+    def _render_chunk(self) -> str:
+        try:
+            rows = list(islice(self._rows, self._chunk_rows))
+        except CsvValidationError as exc:
+            self.error = exc
+            raise
+        if not rows:
+            return ""
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerows(rows)
+        self.row_count += len(rows)
+        return self._buffer.getvalue()
+
+
+def copy_employee_rows(rows: Iterable[tuple], table: str | None = None) -> int:
+    quote_name = connection.ops.quote_name
+    table_name = quote_name(table or Employee._meta.db_table)
+    columns = ", ".join(quote_name(column) for column in COPY_COLUMNS)
+    stream = CsvCopyStream(rows)
+    sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    try:
+        with connection.cursor() as cursor:
+            if is_psycopg3:
+                # psycopg 3 (needed for DATABASE_POOL) pushes data into COPY instead of reading a file object.
+                with cursor.copy(sql) as copy:
+                    while data := stream.read(COPY_WRITE_CHARS):
+                        copy.write(data)
+            else:
+                cursor.copy_expert(sql, stream)
+    except Exception as exc:
+        # Django passes copy_expert() through unwrapped, so this is the raw psycopg2 error.
+        if stream.error is not None and stream.error is not exc:
+            raise stream.error from exc
+        raise
+    return stream.row_count
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+from http.client import HTTPConnection
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test /api/employees/ at several concurrency levels, e.g. a sync gunicorn server against a "
+        "WEB_SERVER=uvicorn one, and report throughput and latency percentiles for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="label=base URL of a running server, e.g. sync=http://127.0.0.1:8000 (repeat to compare)",
+        )
+        parser.add_argument("--username", required=True, help="Account used to log in through /api/login/")
+        parser.add_argument("--password", required=True)
+        parser.add_argument(
+            "--auth",
+            choices=("token", "session"),
+            default="token",
+            help="Send the signed bearer token from the login response, or the session cookie (default: token)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="1,10,50,200",
+            help="Comma-separated numbers of simultaneous connections (default: 1,10,50,200)",
+        )
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level (default: 2000)")
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=10,
+            help="Cycle through ?page=1..N so the run mixes cached pages (default: 10)",
+        )
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            label, separator, base_url = target.partition("=")
+            if not separator or not base_url.startswith("http://"):
+                raise CommandError(f"--target must look like label=http://host:port, got {target!r}")
+            targets.append((label, urlsplit(base_url)))
+        concurrency_levels = [int(value) for value in options["concurrency"].split(",") if value.strip()]
+        if not concurrency_levels or min(concurrency_levels) < 1:
+            raise CommandError("--concurrency needs positive integers.")
+
+        for label, url in targets:
+            auth_header = self._login(url, options["username"], options["password"], options["auth"])
+            for concurrency in concurrency_levels:
+                result = asyncio.run(
+                    self._run_level(url, auth_header, concurrency, options["requests"], max(options["pages"], 1))
+                )
+                self.stdout.write(
+                    f"{label:>8}  concurrency={concurrency:<4}  requests={result['requests']:<6} "
+                    f"errors={result['errors']:<4} {result['requests_per_second']:>9.1f} req/s  "
+                    f"p50={result['p50_ms']:.1f}ms  p95={result['p95_ms']:.1f}ms  p99={result['p99_ms']:.1f}ms"
+                )
+
+    @staticmethod
+    def _login(url, username: str, password: str, auth: str) -> str:
+        connection = HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        try:
+            connection.request(
+                "POST",
+                "/api/login/",
+                body=json.dumps({"username": username, "password": password}),
+                headers={"Content-Type": "application/json"},
+            )
+            response = connection.getresponse()
+            body = response.read()
+        except OSError as exc:
+            raise CommandError(f"Cannot reach {url.geturl()}: {exc}")
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise CommandError(f"Login at {url.geturl()} failed with HTTP {response.status}.")
+        if auth == "token":
+            return f"Authorization: Bearer {json.loads(body)['token']}"
+        cookie = SimpleCookie()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            cookie.load(header)
+        if "sessionid" not in cookie:
+            raise CommandError(f"Login at {url.geturl()} did not set a session cookie.")
+        return f"Cookie: sessionid={cookie['sessionid'].value}"
+
+    async def _run_level(self, url, auth_header: str, concurrency: int, total_requests: int, pages: int) -> dict:
+        remaining = iter(range(total_requests))
+        latencies: list[float] = []
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            reader = writer = None
+            for number in remaining:
+                request = (
+                    f"GET /api/employees/?page={number % pages + 1} HTTP/1.1\r\n"
+                    f"Host: {url.netloc}\r\n{auth_header}\r\nAccept-Encoding: gzip\r\n\r\n"
+                ).encode("ascii")
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+                    writer.write(request)
+                    status, keep_alive = await self._read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    writer = self._close(writer)
+                    continue
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+                if not keep_alive:
+                    writer = self._close(writer)
+            self._close(writer)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "requests": total_requests,
+            "errors": errors,
+            "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": self._percentile(latencies, 0.50) * 1000,
+            "p95_ms": self._percentile(latencies, 0.95) * 1000,
+            "p99_ms": self._percentile(latencies, 0.99) * 1000,
+        }
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+        # Just enough HTTP/1.1 to keep a connection alive: Content-Length or chunked bodies are read and discarded.
+        status = int((await reader.readuntil(b"\r\n")).split(b" ", 2)[1])
+        headers = {}
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+        if headers.get("transfer-encoding") == "chunked":
+            while size := int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16):
+                await reader.readexactly(size + 2)
+            await reader.readuntil(b"\r\n")
+        else:
+            await reader.readexactly(int(headers.get("content-length", "0")))
+        return status, headers.get("connection") != "close"
+
+    @staticmethod
+    def _close(writer):
+        if writer is not None:
+            writer.close()
+        return None
+
+    @staticmethod
+    def _percentile(sorted_values: list[float], fraction: float) -> float:
+        if not sorted_values:
+            return 0.0
+        return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from employees.ingest import copy_csv_range, count_csv_range_rows, split_csv_byte_ranges
+from employees.table_swap import create_scratch_table, drop_scratch_table
+
+
+class Command(BaseCommand):
+    help = "Measure how CSV parsing (and optionally COPY into a scratch table) scales with worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--csv-path",
+            default="/app/Employee.csv",
+            help="Path to Employee.csv (default: /app/Employee.csv)",
+        )
+        parser.add_argument(
+            "--workers",
+            default=",".join(str(count) for count in self._default_worker_counts()),
+            help="Comma-separated worker counts to benchmark (default: powers of two up to the CPU count)",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help=(
+                "Also COPY into a scratch table (dropped afterwards); the live table, the import staging "
+                "table and its checkpoints are never touched."
+            ),
+        )
+
+    @staticmethod
+    def _default_worker_counts() -> list[int]:
+        counts, count = [], 1
+        while count <= (os.cpu_count() or 1):
+            counts.append(count)
+            count *= 2
+        return counts
+
+    def handle(self, *args, **options):
+        csv_path = Path(options["csv_path"])
+        if not csv_path.exists():
+            raise CommandError(f"CSV not found: {csv_path}")
+        try:
+            worker_counts = [int(value) for value in options["workers"].split(",") if value.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers.")
+
+        baseline = None
+        self.stdout.write(f"{'workers':>7}  {'rows':>10}  {'seconds':>8}  {'rows/s':>12}  {'speedup':>7}")
+        for workers in worker_counts:
+            rows, elapsed = self._run(csv_path, max(workers, 1), options["copy"])
+            rate = rows / elapsed if elapsed else float("inf")
+            baseline = baseline or rate
+            self.stdout.write(f"{workers:>7}  {rows:>10}  {elapsed:>8.2f}  {rate:>12,.0f}  {rate / baseline:>6.2f}x")
+
+    @staticmethod
+    def _run(csv_path: Path, workers: int, copy: bool) -> tuple[int, float]:
+        fieldnames, byte_ranges = split_csv_byte_ranges(csv_path, workers)
+        if copy:
+            scratch_table = create_scratch_table()
+            connections.close_all()
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                if copy:
+                    futures = [
+                        pool.submit(copy_csv_range, str(csv_path), fieldnames, start, end, scratch_table)
+                        for start, end in byte_ranges
+                    ]
+                else:
+                    futures = [
+                        pool.submit(count_csv_range_rows, str(csv_path), fieldnames, start, end)
+                        for start, end in byte_ranges
+                    ]
+                rows = sum(future.result() for future in futures)
+            return rows, time.perf_counter() - started
+        finally:
+            if copy:
+                drop_scratch_table()
@@ -0,0 +1,58 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils.safestring import mark_safe
+
+from employees.cache_service import PAGE_SIZE, cache_employee_rows_html, get_cached_employee_rows_html
+from employees.repository import fetch_employee_page
+from employees.views import render_employee_rows
+
+
+class Command(BaseCommand):
+    help = "Time rendering the HTML employee list page with freshly rendered rows and with the cached row fragment."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", type=int, default=1, help="Page to render (default: 1)")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Runs per measurement; best and median are reported (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        page = max(int(options["page"]), 1)
+        repeat = max(int(options["repeat"]), 1)
+        employees = fetch_employee_page(page, PAGE_SIZE)
+        if not employees:
+            raise CommandError(f"Page {page} has no employees.")
+
+        request = RequestFactory().get("/", {"page": page})
+        request.user = AnonymousUser()
+        context = {"employees": employees, "count": len(employees), "page": page, "source": "benchmark"}
+        cache_employee_rows_html(page, render_employee_rows(employees))
+
+        def render_page(rows_html: str) -> str:
+            return render_to_string("employees/employee_list.html", {**context, "employee_rows_html": mark_safe(rows_html)}, request)
+
+        paths = {
+            "rows fragment only": lambda: render_employee_rows(employees),
+            "page, rows rendered": lambda: render_page(render_employee_rows(employees)),
+            "page, rows cached": lambda: render_page(get_cached_employee_rows_html(page)),
+        }
+
+        self.stdout.write(f"{len(employees)} rows on page {page}")
+        self.stdout.write(f"{'path':<22}  {'best (ms)':>10}  {'median (ms)':>12}")
+        for label, render in paths.items():
+            timings = [self._time(render) for _ in range(repeat)]
+            self.stdout.write(f"{label:<22}  {min(timings) * 1000:>10.2f}  {statistics.median(timings) * 1000:>12.2f}")
+
+    @staticmethod
+    def _time(render) -> float:
+        started = time.perf_counter()
+        render()
+        return time.perf_counter() - started
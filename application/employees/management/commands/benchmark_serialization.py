@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.models import Employee
+from employees.repository import (
+    EMPLOYEE_FIELDS,
+    _serialize_employee,
+    serialize_employee_columns,
+    serialize_employee_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare model-instance and values_list serialization of employee rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            default="1000,10000,100000",
+            help="Comma-separated row counts to benchmark (default: 1000,10000,100000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs per measurement; the fastest run is reported (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            row_counts = [int(value) for value in options["rows"].split(",") if value.strip()]
+        except ValueError:
+            raise CommandError("--rows must be a comma-separated list of integers.")
+        repeat = max(int(options["repeat"]), 1)
+
+        available = Employee.objects.count()
+        paths = {
+            "model instances": self._serialize_instances,
+            "values_list dicts": self._serialize_rows,
+            "values_list columns": self._serialize_columns,
+        }
+
+        self.stdout.write(f"{'rows':>8}  {'path':<20}  {'best (ms)':>10}  {'rows/s':>12}")
+        for row_count in row_counts:
+            if row_count > available:
+                self.stdout.write(self.style.WARNING(f"Only {available} employees available; skipping {row_count}."))
+                continue
+            for label, serialize in paths.items():
+                best = min(self._time(serialize, row_count) for _ in range(repeat))
+                rate = row_count / best if best else float("inf")
+                self.stdout.write(f"{row_count:>8}  {label:<20}  {best * 1000:>10.1f}  {rate:>12,.0f}")
+
+    @staticmethod
+    def _time(serialize, row_count: int) -> float:
+        started = time.perf_counter()
+        serialize(row_count)
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _serialize_instances(row_count: int) -> list[dict]:
+        return [_serialize_employee(emp) for emp in Employee.objects.order_by("id")[:row_count]]
+
+    @staticmethod
+    def _serialize_rows(row_count: int) -> list[dict]:
+        return serialize_employee_rows(Employee.objects.order_by("id").values_list(*EMPLOYEE_FIELDS)[:row_count])
+
+    @staticmethod
+    def _serialize_columns(row_count: int) -> dict[str, list]:
+        return serialize_employee_columns(Employee.objects.order_by("id").values_list(*EMPLOYEE_FIELDS)[:row_count])
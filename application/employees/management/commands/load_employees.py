@@ -1,12 +1,37 @@
 import csv
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import connections, transaction
 
-from employees.cache_service import clear_employee_page_cache
-from employees.models import Employee
+from employees.cache_service import bump_dataset_generation
+from employees.count_service import set_employee_count
+from employees.ingest import (
+    COPY_COLUMNS,
+    DEFAULT_IMPORT_BATCH_ROWS,
+    IMPORT_JOB_NAME,
+    CsvValidationError,
+    copy_employee_rows,
+    iter_csv_employee_rows,
+    load_csv_range,
+    split_csv_byte_ranges,
+)
+from employees.progress_tracker import TERMINAL_STATES, BaseProgressTracker, get_progress_tracker
+from employees.repository import delete_all_employees
+from employees.snapshot import snapshot_available
+from employees.stats_service import EmployeeStatsAccumulator, store_employee_stats
+from employees.table_swap import (
+    build_staging_indexes,
+    create_staging_table,
+    drop_staging_table,
+    read_staging_progress,
+    staging_table_exists,
+    swap_staging_table,
+)
+from employees.tasks import refresh_employee_snapshot
 
 
 class Command(BaseCommand):
@@ -18,52 +43,153 @@ class Command(BaseCommand):
             default="/app/Employee.csv",
             help="Path to Employee.csv (default: /app/Employee.csv)",
         )
+        parser.add_argument(
+            "--swap",
+            action="store_true",
+            help="Load into a staging table, index it, then swap it in atomically so readers are never blocked.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Parse and COPY byte ranges of the file in this many processes (implies --swap).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted --swap/--workers import from its last committed checkpoint.",
+        )
+        parser.add_argument(
+            "--batch-rows",
+            type=int,
+            default=DEFAULT_IMPORT_BATCH_ROWS,
+            help=f"Commit and checkpoint staging loads every N rows (default: {DEFAULT_IMPORT_BATCH_ROWS}).",
+        )
 
     def handle(self, *args, **options):
         csv_path = Path(options["csv_path"])
         if not csv_path.exists():
             raise CommandError(f"CSV not found: {csv_path}")
 
+        started = time.perf_counter()
+        try:
+            if options["swap"] or options["workers"] > 1 or options["resume"]:
+                loaded_count, stats = self._load_checkpointed(
+                    csv_path, options["workers"], options["batch_rows"], resume=options["resume"]
+                )
+            else:
+                loaded_count, stats = self._load_sequential(csv_path)
+        except CsvValidationError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        # Old cached pages stay readable until the new generation is picked up, then age out on their own.
+        bump_dataset_generation()
+        set_employee_count(loaded_count)
+        # Attrition stats were counted while the rows streamed into COPY; no extra scan of the new table.
+        store_employee_stats(stats.as_stats())
+        if snapshot_available():
+            try:
+                refresh_employee_snapshot.delay()
+            except Exception as exc:
+                self.stderr.write(f"Could not queue the columnar snapshot rebuild: {exc}")
+        rate = loaded_count / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {loaded_count} employees from {csv_path} in {elapsed:.1f}s ({rate:,.0f} rows/s)."
+            )
+        )
+
+    def _load_sequential(self, csv_path: Path) -> tuple[int, EmployeeStatsAccumulator]:
+        # Rows are validated and streamed straight into COPY, so memory use does not grow with the file.
+        # The delete and the load share one transaction, so this path is all-or-nothing by design.
         with csv_path.open("r", encoding="utf-8", newline="") as fp:
             reader = csv.DictReader(fp)
             if not reader.fieldnames:
                 raise CommandError("CSV has no header row.")
 
-            required = {
-                "Education",
-                "JoiningYear",
-                "City",
-                "PaymentTier",
-                "Age",
-                "Gender",
-                "EverBenched",
-                "ExperienceInCurrentDomain",
-                "LeaveOrNot",
-            }
-            missing = required.difference(reader.fieldnames)
-            if missing:
-                raise CommandError(f"CSV missing required columns: {sorted(missing)}")
-
-            employees: list[Employee] = []
-            for row in reader:
-                employees.append(
-                    Employee(
-                        education=row["Education"].strip(),
-                        joining_year=int(row["JoiningYear"]),
-                        city=row["City"].strip(),
-                        payment_tier=int(row["PaymentTier"]),
-                        age=int(row["Age"]),
-                        gender=row["Gender"].strip(),
-                        ever_benched=row["EverBenched"].strip(),
-                        experience_in_current_domain=int(row["ExperienceInCurrentDomain"]),
-                        leave_or_not=int(row["LeaveOrNot"]),
-                    )
-                )
+            stats = EmployeeStatsAccumulator()
+            with transaction.atomic():
+                delete_all_employees()
+                return copy_employee_rows(stats.track(iter_csv_employee_rows(reader), COPY_COLUMNS)), stats
+
+    def _load_checkpointed(
+        self, csv_path: Path, workers: int, batch_rows: int, resume: bool
+    ) -> tuple[int, EmployeeStatsAccumulator]:
+        tracker = get_progress_tracker()
+        # The staging table and its checkpoints are shared, so only one import may run across the cluster.
+        lease_token = tracker.acquire_lease(IMPORT_JOB_NAME)
+        if lease_token is None:
+            raise CommandError("Another employee import is running; wait for it to finish or for its lease to expire.")
+        try:
+            return self._import_checkpointed(tracker, csv_path, workers, batch_rows, resume)
+        finally:
+            tracker.release_lease(IMPORT_JOB_NAME, lease_token)
+
+    def _import_checkpointed(
+        self, tracker: BaseProgressTracker, csv_path: Path, workers: int, batch_rows: int, resume: bool
+    ) -> tuple[int, EmployeeStatsAccumulator]:
+        # Staging rows commit in batches next to a per-range checkpoint, so an interrupted import keeps
+        # its staging table and --resume only loads what is missing.
+        if resume:
+            fieldnames, byte_ranges = self._resume_plan(tracker, csv_path)
+        else:
+            fieldnames, byte_ranges = split_csv_byte_ranges(csv_path, workers)
+            tracker.clear(IMPORT_JOB_NAME)
+            create_staging_table()
+            tracker.write(IMPORT_JOB_NAME, "STARTED", checkpoint=0, fieldnames=fieldnames, ranges=byte_ranges, **self._file_identity(csv_path))
+
+        try:
+            loaded_count = self._load_ranges(csv_path, fieldnames, byte_ranges, workers, batch_rows)
+            # Per-range stats live next to the checkpoints, which the swap drops.
+            stats = EmployeeStatsAccumulator()
+            for _, _, raw_stats in read_staging_progress().values():
+                stats.merge(EmployeeStatsAccumulator.from_raw(raw_stats))
+            renames = build_staging_indexes()
+            swap_staging_table(renames)
+        except CsvValidationError as exc:
+            drop_staging_table()
+            tracker.write(IMPORT_JOB_NAME, "FAILED", checkpoint=0, error=str(exc))
+            raise
+        except BaseException:
+            self.stderr.write("Import interrupted; rerun with --resume to continue from the last checkpoint.")
+            raise
+
+        tracker.write(IMPORT_JOB_NAME, "COMPLETED", checkpoint=loaded_count, loaded_count=loaded_count)
+        tracker.clear(IMPORT_JOB_NAME)
+        return loaded_count, stats
+
+    def _load_ranges(
+        self, csv_path: Path, fieldnames: list[str], byte_ranges: list[tuple[int, int]], workers: int, batch_rows: int
+    ) -> int:
+        staging_table = create_staging_table(drop_existing=False)
+        workers = min(workers, len(byte_ranges))
+        if workers <= 1:
+            return sum(
+                load_csv_range(str(csv_path), fieldnames, start, end, staging_table, part, batch_rows)
+                for part, (start, end) in enumerate(byte_ranges)
+            )
+
+        # Forked workers must not share the parent's socket; each opens its own connection.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            futures = [
+                pool.submit(load_csv_range, str(csv_path), fieldnames, start, end, staging_table, part, batch_rows)
+                for part, (start, end) in enumerate(byte_ranges)
+            ]
+            return sum(future.result() for future in futures)
 
-        with transaction.atomic():
-            Employee.objects.all().delete()
-            Employee.objects.bulk_create(employees, batch_size=1000)
+    def _resume_plan(self, tracker: BaseProgressTracker, csv_path: Path) -> tuple[list[str], list[tuple[int, int]]]:
+        latest_state = tracker.get_latest_state(IMPORT_JOB_NAME)
+        if latest_state is None or latest_state.state in TERMINAL_STATES or not staging_table_exists():
+            raise CommandError("No interrupted import to resume.")
+        payload = latest_state.payload
+        # Byte-offset checkpoints are only meaningful against the exact same file.
+        identity = self._file_identity(csv_path)
+        if any(payload.get(key) != value for key, value in identity.items()):
+            raise CommandError(f"{csv_path} is not the file the interrupted import was reading; start a fresh load.")
+        return payload["fieldnames"], [tuple(byte_range) for byte_range in payload["ranges"]]
 
-        clear_employee_page_cache()
-        cache.clear()
-        self.stdout.write(self.style.SUCCESS(f"Loaded {len(employees)} employees from {csv_path}."))
+    def _file_identity(self, csv_path: Path) -> dict:
+        stat = csv_path.stat()
+        return {"csv_path": str(csv_path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
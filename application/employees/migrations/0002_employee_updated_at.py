@@ -0,0 +1,16 @@
+from django.db import migrations, models
+from django.db.models.functions import Now
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_default=Now(), db_index=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("employees", "0002_employee_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobProgress",
+            fields=[
+                ("job_name", models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ("state", models.CharField(max_length=32)),
+                ("checkpoint", models.BigIntegerField(null=True)),
+                ("payload", models.JSONField(default=dict)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "employee_job_progress",
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; it keeps the table writable while it builds.
+    atomic = False
+
+    dependencies = [
+        ("employees", "0003_jobprogress"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(fields=["city", "id"], name="employees_city_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(fields=["education", "id"], name="employees_education_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(fields=["payment_tier", "id"], name="employees_payment_tier_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(fields=["joining_year", "id"], name="employees_joining_year_id_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="employee",
+            index=models.Index(fields=["leave_or_not", "id"], name="employees_leave_or_not_id_idx"),
+        ),
+    ]
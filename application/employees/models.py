@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Now
 
 
 class Employee(models.Model):
@@ -11,10 +12,36 @@ class Employee(models.Model):
     ever_benched = models.CharField(max_length=5)
     experience_in_current_domain = models.IntegerField()
     leave_or_not = models.IntegerField()
+    # db_default covers rows written by COPY/raw SQL; auto_now covers ORM saves. Drives the delta cache refresh.
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now(), db_index=True)
 
     class Meta:
         db_table = "employees"
         ordering = ["id"]
+        # Filter column first, id second: serves the equality filters of /api/employees/ plus id ordering,
+        # keyset cursors and sort=<field> with its id tie-break.
+        indexes = [
+            models.Index(fields=["city", "id"], name="employees_city_id_idx"),
+            models.Index(fields=["education", "id"], name="employees_education_id_idx"),
+            models.Index(fields=["payment_tier", "id"], name="employees_payment_tier_id_idx"),
+            models.Index(fields=["joining_year", "id"], name="employees_joining_year_id_idx"),
+            models.Index(fields=["leave_or_not", "id"], name="employees_leave_or_not_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.education} | {self.city}"
+
+
+class JobProgress(models.Model):
+    # Latest progress event per job for PROGRESS_TRACKER_BACKEND=database.
+    job_name = models.CharField(max_length=200, primary_key=True)
+    state = models.CharField(max_length=32)
+    checkpoint = models.BigIntegerField(null=True)
+    payload = models.JSONField(default=dict)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "employee_job_progress"
+
+    def __str__(self) -> str:
+        return f"{self.job_name} | {self.state}"
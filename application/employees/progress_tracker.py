@@ -1,15 +1,33 @@
 from __future__ import annotations
 
+import fcntl
 import json
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import JobProgress
 
 
 TERMINAL_STATES = {"COMPLETED", "FAILED"}
+INDEX_SUFFIX = ".index"
+LOCK_SUFFIX = ".lock"
+INDEX_SAVE_EVERY_LINES = 1000
+PROGRESS_LATEST_KEY = "employees:progress:latest"
+PROGRESS_EVENTS_KEY = "employees:progress:events"
+PROGRESS_EVENTS_MAXLEN = 10000
+PROGRESS_LEASE_KEY_PREFIX = "employees:progress_lease"
 
 
 @dataclass
@@ -19,50 +37,22 @@ class ProgressState:
     payload: dict[str, Any]
 
 
-class ProgressTracker:
-    def __init__(self, log_path: Path | None = None):
-        self.log_path = Path(log_path or settings.PROGRESS_LOG_PATH)
-        self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.log_path.exists():
-            self.log_path.touch()
+def _job_matches(event_job_name: str, job_name: str) -> bool:
+    return event_job_name == job_name or event_job_name.startswith(f"{job_name}:")
 
-    def write(self, job_name: str, state: str, checkpoint: int | None = None, **kwargs) -> None:
-        event = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "job_name": job_name,
-            "state": state,
-            "checkpoint": checkpoint,
-            "payload": kwargs,
-        }
-        with self.log_path.open("a", encoding="utf-8") as fp:
-            fp.write(json.dumps(event) + "\n")
 
-    def clear(self) -> None:
-        with self.log_path.open("w", encoding="utf-8"):
-            pass
+class BaseProgressTracker(ABC):
+    @abstractmethod
+    def write(self, job_name: str, state: str, checkpoint: int | None = None, **kwargs) -> None: ...
 
-    def get_latest_state(self, job_name: str) -> ProgressState | None:
-        latest_event: dict[str, Any] | None = None
-        with self.log_path.open("r", encoding="utf-8") as fp:
-            for line in fp:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    event = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if event.get("job_name") == job_name:
-                    latest_event = event
+    @abstractmethod
+    def clear(self, job_name: str | None = None) -> None: ...
 
-        if not latest_event:
-            return None
+    @abstractmethod
+    def get_latest_state(self, job_name: str) -> ProgressState | None: ...
 
-        return ProgressState(
-            state=latest_event.get("state", "UNKNOWN"),
-            checkpoint=latest_event.get("checkpoint"),
-            payload=latest_event.get("payload", {}),
-        )
+    def close(self) -> None:
+        pass
 
     def get_resume_checkpoint(self, job_name: str) -> int | None:
         latest_state = self.get_latest_state(job_name)
@@ -77,3 +67,286 @@ class ProgressTracker:
         if latest_state is None:
             return False
         return latest_state.state not in TERMINAL_STATES
+
+    def acquire_lease(self, job_name: str, ttl_seconds: float | None = None) -> str | None:
+        # Cluster-wide and backend-independent: SET NX in the shared Redis cache, so only one
+        # node gets to act on (e.g. run or resume) a job until the lease is released or expires.
+        # Returns the holder's token, or None while someone else holds the lease.
+        timeout = ttl_seconds if ttl_seconds is not None else settings.PROGRESS_LEASE_SECONDS
+        token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        return token if cache.add(self._lease_key(job_name), token, timeout=timeout) else None
+
+    def release_lease(self, job_name: str, token: str) -> None:
+        # Only the holder releases; a lease that expired and was taken by another run is left alone.
+        if cache.get(self._lease_key(job_name)) == token:
+            cache.delete(self._lease_key(job_name))
+
+    @staticmethod
+    def _lease_key(job_name: str) -> str:
+        return f"{PROGRESS_LEASE_KEY_PREFIX}:{job_name}"
+
+    @staticmethod
+    def _event(job_name: str, state: str, checkpoint: int | None, payload: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "job_name": job_name,
+            "state": state,
+            "checkpoint": checkpoint,
+            "payload": payload,
+        }
+
+    @staticmethod
+    def _state_from_event(event: dict[str, Any] | None) -> ProgressState | None:
+        if not event:
+            return None
+        return ProgressState(
+            state=event.get("state", "UNKNOWN"),
+            checkpoint=event.get("checkpoint"),
+            payload=event.get("payload", {}),
+        )
+
+
+class ProgressTracker(BaseProgressTracker):
+    # Append-only JSON-lines log with an in-memory latest-event-per-job index. Lookups only parse lines
+    # appended since the last one, the index is persisted to a sidecar file keyed by the log's inode, and
+    # the log is periodically compacted down to one line per job.
+    def __init__(
+        self,
+        log_path: Path | None = None,
+        fsync_every: int | None = None,
+        compact_bytes: int | None = None,
+    ):
+        self.log_path = Path(log_path or settings.PROGRESS_LOG_PATH)
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.log_path.exists():
+            self.log_path.touch()
+        self.index_path = self.log_path.with_name(f"{self.log_path.name}{INDEX_SUFFIX}")
+        self.lock_path = self.log_path.with_name(f"{self.log_path.name}{LOCK_SUFFIX}")
+        self.fsync_every = max(int(fsync_every or settings.PROGRESS_LOG_FSYNC_EVERY), 1)
+        self.compact_bytes = int(settings.PROGRESS_LOG_COMPACT_BYTES if compact_bytes is None else compact_bytes)
+
+        self._fp: BinaryIO | None = None
+        self._unsynced_writes = 0
+        self._latest: dict[str, dict[str, Any]] = {}
+        self._inode: int | None = None
+        self._offset = 0
+        self._lines_since_index_save = 0
+        self._load_index()
+
+    def write(self, job_name: str, state: str, checkpoint: int | None = None, **kwargs) -> None:
+        event = self._event(job_name, state, checkpoint, kwargs)
+        line = (json.dumps(event) + "\n").encode("utf-8")
+        with self._locked(fcntl.LOCK_SH):
+            fp = self._open_for_append()
+            fp.write(line)
+            fp.flush()
+            self._unsynced_writes += 1
+            if self._unsynced_writes < self.fsync_every:
+                return
+            os.fsync(fp.fileno())
+            self._unsynced_writes = 0
+            log_size = fp.tell()
+
+        if self.compact_bytes and log_size >= self.compact_bytes:
+            self.compact()
+        else:
+            self._refresh()
+            self._save_index()
+
+    def clear(self, job_name: str | None = None) -> None:
+        if job_name is None:
+            self._rewrite(lambda event_job_name: False)
+            return
+        # Drop only this job and its sub-jobs ("<job_name>:..."), keeping other jobs' progress.
+        self._rewrite(lambda event_job_name: not _job_matches(event_job_name, job_name))
+
+    def compact(self) -> None:
+        self._rewrite(lambda event_job_name: True)
+
+    def close(self) -> None:
+        if self._fp is not None:
+            if self._unsynced_writes:
+                os.fsync(self._fp.fileno())
+                self._unsynced_writes = 0
+            self._fp.close()
+            self._fp = None
+
+    def get_latest_state(self, job_name: str) -> ProgressState | None:
+        self._refresh()
+        return self._state_from_event(self._latest.get(job_name))
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        # Writers share the lock; compaction takes it exclusively so no append lands in a replaced file.
+        with self.lock_path.open("a") as lock_fp:
+            fcntl.flock(lock_fp.fileno(), operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_fp.fileno(), fcntl.LOCK_UN)
+
+    def _open_for_append(self) -> BinaryIO:
+        if self._fp is not None and self._fp_inode() != self._path_inode():
+            # Another process compacted or cleared the log; our handle points at the replaced file.
+            self._fp.close()
+            self._fp = None
+            self._unsynced_writes = 0
+        if self._fp is None:
+            self._fp = self.log_path.open("ab")
+        return self._fp
+
+    def _fp_inode(self) -> int | None:
+        return os.fstat(self._fp.fileno()).st_ino if self._fp is not None else None
+
+    def _path_inode(self) -> int | None:
+        try:
+            return self.log_path.stat().st_ino
+        except FileNotFoundError:
+            return None
+
+    def _load_index(self) -> None:
+        self._latest, self._offset, self._lines_since_index_save = {}, 0, 0
+        self._inode = self._path_inode()
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if not isinstance(index, dict) or index.get("inode") != self._inode:
+            return
+        if index.get("offset", 0) > self.log_path.stat().st_size:
+            return
+        self._latest = index.get("jobs", {})
+        self._offset = index.get("offset", 0)
+
+    def _save_index(self) -> None:
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(
+            json.dumps({"inode": self._inode, "offset": self._offset, "jobs": self._latest}),
+            encoding="utf-8",
+        )
+        os.replace(temp_path, self.index_path)
+        self._lines_since_index_save = 0
+
+    def _refresh(self) -> None:
+        try:
+            stat = self.log_path.stat()
+        except FileNotFoundError:
+            self.log_path.touch()
+            stat = self.log_path.stat()
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._load_index()
+        if stat.st_size == self._offset:
+            return
+
+        with self.log_path.open("rb") as fp:
+            fp.seek(self._offset)
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    # Half-written line from a concurrent writer; pick it up on the next refresh.
+                    break
+                self._offset += len(line)
+                self._lines_since_index_save += 1
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(event, dict) and event.get("job_name"):
+                    self._latest[event["job_name"]] = event
+        if self._lines_since_index_save >= INDEX_SAVE_EVERY_LINES:
+            self._save_index()
+
+    def _rewrite(self, keep: Callable[[str], bool]) -> None:
+        with self._locked(fcntl.LOCK_EX):
+            self._refresh()
+            latest = {job_name: event for job_name, event in self._latest.items() if keep(job_name)}
+            temp_path = self.log_path.with_name(f"{self.log_path.name}.{os.getpid()}.tmp")
+            with temp_path.open("wb") as fp:
+                for event in sorted(latest.values(), key=lambda event: event.get("timestamp", "")):
+                    fp.write((json.dumps(event) + "\n").encode("utf-8"))
+                fp.flush()
+                os.fsync(fp.fileno())
+                offset = fp.tell()
+            os.replace(temp_path, self.log_path)
+            self.close()
+            self._latest, self._offset, self._inode = latest, offset, self._path_inode()
+            self._save_index()
+
+
+class RedisProgressTracker(BaseProgressTracker):
+    # Latest event per job lives in one hash, so every checkpoint is a single atomic HSET shared by all
+    # nodes; the event history goes to a capped stream for inspection.
+    def write(self, job_name: str, state: str, checkpoint: int | None = None, **kwargs) -> None:
+        event = json.dumps(self._event(job_name, state, checkpoint, kwargs))
+        pipeline = self._client().pipeline(transaction=True)
+        pipeline.hset(self._key(PROGRESS_LATEST_KEY), job_name, event)
+        pipeline.xadd(self._key(PROGRESS_EVENTS_KEY), {"event": event}, maxlen=PROGRESS_EVENTS_MAXLEN, approximate=True)
+        pipeline.execute()
+
+    def clear(self, job_name: str | None = None) -> None:
+        client = self._client()
+        if job_name is None:
+            client.delete(self._key(PROGRESS_LATEST_KEY), self._key(PROGRESS_EVENTS_KEY))
+            return
+        job_names = [name for name in client.hkeys(self._key(PROGRESS_LATEST_KEY)) if _job_matches(name.decode(), job_name)]
+        if job_names:
+            client.hdel(self._key(PROGRESS_LATEST_KEY), *job_names)
+
+    def get_latest_state(self, job_name: str) -> ProgressState | None:
+        raw_event = self._client().hget(self._key(PROGRESS_LATEST_KEY), job_name)
+        return self._state_from_event(json.loads(raw_event) if raw_event else None)
+
+    @staticmethod
+    def _client():
+        return cache._cache.get_client(write=True)
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return cache.make_and_validate_key(key)
+
+
+class DatabaseProgressTracker(BaseProgressTracker):
+    # One row per job, written with a single INSERT ... ON CONFLICT DO UPDATE.
+    def write(self, job_name: str, state: str, checkpoint: int | None = None, **kwargs) -> None:
+        JobProgress.objects.bulk_create(
+            [
+                JobProgress(
+                    job_name=job_name,
+                    state=state,
+                    checkpoint=checkpoint,
+                    payload=kwargs,
+                    updated_at=datetime.now(timezone.utc),
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["job_name"],
+            update_fields=["state", "checkpoint", "payload", "updated_at"],
+        )
+
+    def clear(self, job_name: str | None = None) -> None:
+        if job_name is None:
+            JobProgress.objects.all().delete()
+            return
+        JobProgress.objects.filter(job_name=job_name).delete()
+        JobProgress.objects.filter(job_name__startswith=f"{job_name}:").delete()
+
+    def get_latest_state(self, job_name: str) -> ProgressState | None:
+        row = JobProgress.objects.filter(job_name=job_name).values("state", "checkpoint", "payload").first()
+        return self._state_from_event(row)
+
+
+PROGRESS_TRACKER_BACKENDS: dict[str, type[BaseProgressTracker]] = {
+    "file": ProgressTracker,
+    "redis": RedisProgressTracker,
+    "database": DatabaseProgressTracker,
+}
+
+
+def get_progress_tracker() -> BaseProgressTracker:
+    backend = settings.PROGRESS_TRACKER_BACKEND
+    try:
+        tracker_class = PROGRESS_TRACKER_BACKENDS[backend]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"PROGRESS_TRACKER_BACKEND must be one of {sorted(PROGRESS_TRACKER_BACKENDS)}, got {backend!r}."
+        )
+    return tracker_class()
@@ -1,8 +1,28 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime
 from typing import Any
 
+from django.db import connection
+from django.db.models import QuerySet
+
+from .filters import DEFAULT_EMPLOYEE_QUERY, EmployeeQuery
 from .models import Employee
 
 
+EMPLOYEE_FIELDS = (
+    "id",
+    "education",
+    "joining_year",
+    "city",
+    "payment_tier",
+    "age",
+    "gender",
+    "ever_benched",
+    "experience_in_current_domain",
+    "leave_or_not",
+)
+
+
 def _serialize_employee(employee: Employee) -> dict[str, Any]:
     return {
         "id": employee.id,
@@ -18,9 +38,25 @@ def _serialize_employee(employee: Employee) -> dict[str, Any]:
     }
 
 
+def _employee_rows(queryset: QuerySet) -> QuerySet:
+    # Plain tuples skip Employee.__init__ and per-field attribute access entirely.
+    return queryset.values_list(*EMPLOYEE_FIELDS)
+
+
+def serialize_employee_rows(rows: Iterable[tuple]) -> list[dict[str, Any]]:
+    return [dict(zip(EMPLOYEE_FIELDS, row)) for row in rows]
+
+
+def serialize_employee_columns(rows: Iterable[tuple]) -> dict[str, list[Any]]:
+    columns = list(zip(*rows))
+    if not columns:
+        return {field: [] for field in EMPLOYEE_FIELDS}
+    return {field: list(values) for field, values in zip(EMPLOYEE_FIELDS, columns)}
+
+
 def fetch_all_employees() -> list[dict[str, Any]]:
     queryset = Employee.objects.all().order_by("id")
-    return [_serialize_employee(emp) for emp in queryset]
+    return serialize_employee_rows(_employee_rows(queryset))
 
 
 def fetch_employee_page(page: int, page_size: int) -> list[dict[str, Any]]:
@@ -28,13 +64,136 @@ def fetch_employee_page(page: int, page_size: int) -> list[dict[str, Any]]:
     safe_page_size = max(int(page_size), 1)
     offset = (safe_page - 1) * safe_page_size
     queryset = Employee.objects.all().order_by("id")[offset : offset + safe_page_size]
-    return [_serialize_employee(emp) for emp in queryset]
+    return serialize_employee_rows(_employee_rows(queryset))
+
+
+def fetch_employee_page_columns(page: int, page_size: int) -> dict[str, list[Any]]:
+    safe_page = max(int(page), 1)
+    safe_page_size = max(int(page_size), 1)
+    offset = (safe_page - 1) * safe_page_size
+    queryset = Employee.objects.all().order_by("id")[offset : offset + safe_page_size]
+    return serialize_employee_columns(_employee_rows(queryset))
+
+
+def iter_employee_rows(offset: int = 0, chunk_size: int = 2000) -> Iterator[tuple]:
+    # iterator() streams through a server-side cursor on PostgreSQL instead of loading the whole result.
+    queryset = _employee_rows(Employee.objects.all().order_by("id"))
+    if offset > 0:
+        queryset = queryset[offset:]
+    return queryset.iterator(chunk_size=max(int(chunk_size), 1))
+
+
+def iter_employee_rows_in_id_range(
+    start_id: int,
+    end_id: int | None = None,
+    chunk_size: int = 2000,
+) -> Iterator[tuple]:
+    queryset = Employee.objects.filter(id__gte=start_id)
+    if end_id is not None:
+        queryset = queryset.filter(id__lt=end_id)
+    return _employee_rows(queryset.order_by("id")).iterator(chunk_size=max(int(chunk_size), 1))
+
+
+def fetch_shard_start_ids(rows_per_shard: int) -> list[int]:
+    # First id of every rows_per_shard-th row, so shards line up with offset-based page numbers
+    # even when ids have gaps. The window scan only touches the primary key index.
+    table = connection.ops.quote_name(Employee._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS position FROM {table}) AS numbered "
+            "WHERE position %% %s = 0 ORDER BY id",
+            [max(int(rows_per_shard), 1)],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def fetch_changed_page_numbers(changed_since: datetime, page_size: int) -> list[int]:
+    # Changed ids come from the updated_at index; their offset pages from a primary-key-only window scan
+    # that stops at the highest changed id.
+    table = connection.ops.quote_name(Employee._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH changed AS (SELECT id FROM {table} WHERE updated_at > %s) "
+            "SELECT DISTINCT numbered.position / %s + 1 FROM ("
+            f"SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS position FROM {table} "
+            "WHERE id <= (SELECT MAX(id) FROM changed)"
+            ") AS numbered JOIN changed USING (id) ORDER BY 1",
+            [changed_since, max(int(page_size), 1)],
+        )
+        return [int(row[0]) for row in cursor.fetchall()]
+
+
+def fetch_employee_group_stats(age_bucket_width: int) -> list[tuple]:
+    # One scan for every breakdown: one row per (grouping set, value) plus the grand total, each carrying
+    # COUNT(*) and SUM(leave_or_not). Columns: city, education, payment_tier, joining_year, age bucket,
+    # experience, count, leavers; only the column of the row's own grouping set is non-NULL.
+    table = connection.ops.quote_name(Employee._meta.db_table)
+    # Inlined (it is an int) so the SELECT and GROUP BY expressions are textually identical.
+    age_bucket = f"age / {max(int(age_bucket_width), 1)} * {max(int(age_bucket_width), 1)}"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT city, education, payment_tier, joining_year, {age_bucket}, "
+            "experience_in_current_domain, COUNT(*), SUM(leave_or_not) "
+            f"FROM {table} GROUP BY GROUPING SETS "
+            f"((city), (education), (payment_tier), (joining_year), ({age_bucket}), (experience_in_current_domain), ())"
+        )
+        return cursor.fetchall()
+
+
+def fetch_page_number_for_id(employee_id: int, page_size: int) -> int:
+    position = Employee.objects.filter(id__lt=employee_id).count()
+    return position // max(int(page_size), 1) + 1
 
 
 def fetch_employee_count() -> int:
     return Employee.objects.count()
 
 
-def fetch_employee_batch_after_id(last_id: int, batch_size: int) -> list[dict[str, Any]]:
-    queryset = Employee.objects.filter(id__gt=last_id).order_by("id")[:batch_size]
-    return [_serialize_employee(emp) for emp in queryset]
+def fetch_employee_count_estimate() -> int:
+    # Planner statistics are refreshed by (auto)ANALYZE; -1 means the table was never analyzed.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [Employee._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return fetch_employee_count()
+    return int(row[0])
+
+
+def delete_all_employees() -> None:
+    # queryset.delete() would load every row to send post_delete signals; one raw DELETE is enough here.
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {connection.ops.quote_name(Employee._meta.db_table)}")
+
+
+def fetch_employee_batch_after_id(
+    last_id: int, batch_size: int, query: EmployeeQuery = DEFAULT_EMPLOYEE_QUERY
+) -> list[dict[str, Any]]:
+    queryset = Employee.objects.filter(id__gt=last_id, **query.lookups()).order_by("id")[:batch_size]
+    return serialize_employee_rows(_employee_rows(queryset))
+
+
+def fetch_employee_batch_before_id(
+    first_id: int, batch_size: int, query: EmployeeQuery = DEFAULT_EMPLOYEE_QUERY
+) -> list[dict[str, Any]]:
+    queryset = Employee.objects.filter(id__lt=first_id, **query.lookups()).order_by("-id")[:batch_size]
+    return serialize_employee_rows(list(_employee_rows(queryset))[::-1])
+
+
+def fetch_filtered_employee_page(query: EmployeeQuery, page: int, page_size: int) -> list[dict[str, Any]]:
+    # The (field, id) indexes serve both the filter and the default id ordering.
+    offset = (page - 1) * page_size
+    queryset = Employee.objects.filter(**query.lookups()).order_by(*query.ordering())[offset : offset + page_size]
+    return serialize_employee_rows(_employee_rows(queryset))
+
+
+def iter_filtered_employee_rows(query: EmployeeQuery, chunk_size: int = 2000) -> Iterator[tuple]:
+    # Server-side cursor: one sequential scan, streamed chunk_size rows at a time.
+    queryset = Employee.objects.filter(**query.lookups()).order_by(*query.ordering())
+    return _employee_rows(queryset).iterator(chunk_size=max(int(chunk_size), 1))
+
+
+def fetch_filtered_employee_count(query: EmployeeQuery) -> int:
+    return Employee.objects.filter(**query.lookups()).count()
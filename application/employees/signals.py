@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache_service import bump_data_generation, record_deleted_employee
+from .count_service import adjust_employee_count
+from .models import Employee
+
+
+@receiver(post_save, sender=Employee, dispatch_uid="employees.signals.employee_saved")
+def employee_saved(sender, instance: Employee, created: bool, **kwargs) -> None:
+    def on_commit() -> None:
+        if created:
+            adjust_employee_count(1)
+        # Drops every process's L1 copies, which are not re-validated against the count.
+        bump_data_generation()
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_delete, sender=Employee, dispatch_uid="employees.signals.employee_deleted")
+def employee_deleted(sender, instance: Employee, **kwargs) -> None:
+    employee_id = instance.pk
+
+    def on_commit() -> None:
+        adjust_employee_count(-1)
+        record_deleted_employee(employee_id)
+        bump_data_generation()
+
+    transaction.on_commit(on_commit)
@@ -0,0 +1,206 @@
+import json
+import os
+import shutil
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+from .filters import EmployeeQuery
+from .repository import EMPLOYEE_FIELDS, iter_employee_rows, serialize_employee_rows
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+SNAPSHOT_POINTER_NAME = "current.json"
+SNAPSHOT_META_NAME = "meta.json"
+SNAPSHOT_CHECK_SECONDS = 1.0
+SNAPSHOT_BUILD_CHUNK_ROWS = 20000
+# Integer columns and their array typecode / NumPy dtype; the text columns below are dictionary-encoded.
+NUMERIC_COLUMNS = {
+    "id": ("q", "int64"),
+    "joining_year": ("i", "int32"),
+    "payment_tier": ("i", "int32"),
+    "age": ("i", "int32"),
+    "experience_in_current_domain": ("i", "int32"),
+    "leave_or_not": ("i", "int32"),
+}
+CATEGORICAL_COLUMNS = ("education", "city", "gender", "ever_benched")
+
+_snapshot_lock = threading.Lock()
+_snapshot_state: dict[str, Any] = {"snapshot": None, "checked_at": 0.0}
+
+
+def snapshot_available() -> bool:
+    return np is not None and settings.EMPLOYEE_SNAPSHOT_ENABLED
+
+
+class EmployeeSnapshot:
+    # Read-only column arrays memory-mapped from .npy files, so every gunicorn worker on the host shares
+    # the same page-cache copy. Rows are stored in id order; text columns hold codes into sorted
+    # dictionaries, so code order is value order.
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        meta = json.loads((self.path / SNAPSHOT_META_NAME).read_text(encoding="utf-8"))
+        self.row_count = int(meta["row_count"])
+        self.dataset_generation = int(meta["dataset_generation"])
+        # Absent in snapshots written before the data generation was recorded; those never match.
+        self.data_generation = meta.get("data_generation")
+        self.built_at = meta["built_at"]
+        self.dictionaries: dict[str, list[str]] = meta["dictionaries"]
+        self._codes = {column: {value: code for code, value in enumerate(values)} for column, values in self.dictionaries.items()}
+        self.columns = {
+            column: np.load(self.path / f"{column}.npy", mmap_mode="r") for column in (*NUMERIC_COLUMNS, *CATEGORICAL_COLUMNS)
+        }
+
+    def _mask(self, query: EmployeeQuery):
+        mask = None
+        for field, values in query.filters:
+            if field in self._codes:
+                values = [self._codes[field][value] for value in values if value in self._codes[field]]
+            field_mask = np.isin(self.columns[field], values)
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+    def count(self, query: EmployeeQuery) -> int:
+        mask = self._mask(query)
+        return self.row_count if mask is None else int(np.count_nonzero(mask))
+
+    def page(self, query: EmployeeQuery, page: int, page_size: int) -> list[dict[str, Any]]:
+        mask = self._mask(query)
+        positions = np.arange(self.row_count) if mask is None else np.flatnonzero(mask)
+        descending = query.sort.startswith("-")
+        sort_field = query.sort.lstrip("-")
+        if sort_field != "id":
+            # Same order as EmployeeQuery.ordering(): the sort column, then id in the same direction.
+            keys = self.columns[sort_field][positions].astype("int64")
+            positions = positions[np.lexsort((-positions, -keys) if descending else (positions, keys))]
+        elif descending:
+            positions = positions[::-1]
+
+        offset = (page - 1) * page_size
+        return self.rows(positions[offset : offset + page_size])
+
+    def rows(self, positions) -> list[dict[str, Any]]:
+        columns = []
+        for field in EMPLOYEE_FIELDS:
+            values = self.columns[field][positions].tolist()
+            if field in self.dictionaries:
+                dictionary = self.dictionaries[field]
+                values = [dictionary[code] for code in values]
+            columns.append(values)
+        return serialize_employee_rows(zip(*columns))
+
+    def stats_accumulator(self):
+        from .stats_service import EmployeeStatsAccumulator, STATS_GROUPS
+
+        leavers = self.columns["leave_or_not"]
+        accumulator = EmployeeStatsAccumulator(total=[self.row_count, int(leavers.sum())])
+        for name, column, width in STATS_GROUPS:
+            values = self.columns[column]
+            if width is not None and width > 1:
+                values = values // width * width
+            keys, inverse = np.unique(values, return_inverse=True)
+            counts = np.bincount(inverse)
+            leaver_counts = np.bincount(inverse, weights=leavers)
+            if column in self.dictionaries:
+                keys = [self.dictionaries[column][code] for code in keys.tolist()]
+            else:
+                keys = keys.tolist()
+            accumulator.groups[name] = {
+                key: [int(count), int(leaver_count)] for key, count, leaver_count in zip(keys, counts, leaver_counts)
+            }
+        return accumulator
+
+
+def _snapshot_dir() -> Path:
+    return Path(settings.EMPLOYEE_SNAPSHOT_DIR)
+
+
+def build_employee_snapshot(
+    data_generation: int, dataset_generation: int, chunk_size: int = SNAPSHOT_BUILD_CHUNK_ROWS
+) -> EmployeeSnapshot:
+    # Streams the table once over a server-side cursor into compact arrays, writes one .npy per column
+    # into a fresh directory and then atomically repoints current.json at it.
+    numeric = {column: array(typecode) for column, (typecode, _) in NUMERIC_COLUMNS.items()}
+    categorical = {column: array("i") for column in CATEGORICAL_COLUMNS}
+    dictionaries: dict[str, dict[str, int]] = {column: {} for column in CATEGORICAL_COLUMNS}
+    numeric_targets = [(EMPLOYEE_FIELDS.index(column), values.append) for column, values in numeric.items()]
+    categorical_targets = [
+        (EMPLOYEE_FIELDS.index(column), categorical[column].append, dictionaries[column]) for column in CATEGORICAL_COLUMNS
+    ]
+    for row in iter_employee_rows(chunk_size=chunk_size):
+        for index, append in numeric_targets:
+            append(row[index])
+        for index, append, dictionary in categorical_targets:
+            value = row[index]
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary)
+            append(code)
+
+    root = _snapshot_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    name = f"generation-{int(dataset_generation)}-{time.time_ns()}"
+    temp_path = root / f".{name}.tmp"
+    temp_path.mkdir()
+    for column, (_, dtype) in NUMERIC_COLUMNS.items():
+        np.save(temp_path / f"{column}.npy", np.frombuffer(numeric[column], dtype=dtype))
+    sorted_dictionaries = {}
+    for column in CATEGORICAL_COLUMNS:
+        # Re-code against the sorted dictionary so comparing codes compares values.
+        values = sorted(dictionaries[column])
+        recode = np.empty(len(values), dtype="int32")
+        for code, value in enumerate(values):
+            recode[dictionaries[column][value]] = code
+        codes = np.frombuffer(categorical[column], dtype="int32")
+        np.save(temp_path / f"{column}.npy", recode[codes] if len(codes) else codes)
+        sorted_dictionaries[column] = values
+    meta = {
+        "row_count": len(numeric["id"]),
+        "data_generation": int(data_generation),
+        "dataset_generation": int(dataset_generation),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "dictionaries": sorted_dictionaries,
+    }
+    (temp_path / SNAPSHOT_META_NAME).write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(temp_path, root / name)
+
+    pointer_temp = root / f".{SNAPSHOT_POINTER_NAME}.{os.getpid()}.tmp"
+    pointer_temp.write_text(json.dumps({"path": name}), encoding="utf-8")
+    os.replace(pointer_temp, root / SNAPSHOT_POINTER_NAME)
+
+    # Workers still mapping an older snapshot keep their pages until they switch; unlinking is safe.
+    for path in root.glob("generation-*"):
+        if path.name != name:
+            shutil.rmtree(path, ignore_errors=True)
+    return EmployeeSnapshot(root / name)
+
+
+def get_employee_snapshot(data_generation: int, dataset_generation: int) -> EmployeeSnapshot | None:
+    # Per-process handle on the current snapshot; current.json is re-read at most once a second.
+    # Reloads bump the dataset generation and every row change the data generation, so a snapshot
+    # is only served while both still match the ones it was built from. Cache refreshes bump neither.
+    if not snapshot_available():
+        return None
+    now = time.monotonic()
+    with _snapshot_lock:
+        snapshot = _snapshot_state["snapshot"]
+        if now - _snapshot_state["checked_at"] >= SNAPSHOT_CHECK_SECONDS:
+            _snapshot_state["checked_at"] = now
+            try:
+                name = json.loads((_snapshot_dir() / SNAPSHOT_POINTER_NAME).read_text(encoding="utf-8"))["path"]
+                if snapshot is None or snapshot.path.name != name:
+                    snapshot = _snapshot_state["snapshot"] = EmployeeSnapshot(_snapshot_dir() / name)
+            except (FileNotFoundError, KeyError, ValueError):
+                snapshot = _snapshot_state["snapshot"] = None
+    if snapshot is None or (snapshot.data_generation, snapshot.dataset_generation) != (data_generation, dataset_generation):
+        return None
+    return snapshot
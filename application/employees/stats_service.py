@@ -0,0 +1,134 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache_service import get_data_generations, get_dataset_generation
+from .repository import fetch_employee_group_stats
+from .snapshot import get_employee_snapshot
+
+
+EMPLOYEE_STATS_CACHE_KEY_PREFIX = "employees:stats"
+AGE_BUCKET_WIDTH = 5
+# (stats group, employees column, bucket width) in the column order fetch_employee_group_stats() returns.
+STATS_GROUPS: tuple[tuple[str, str, int | None], ...] = (
+    ("city", "city", None),
+    ("education", "education", None),
+    ("payment_tier", "payment_tier", None),
+    ("joining_year", "joining_year", None),
+    ("age", "age", AGE_BUCKET_WIDTH),
+    ("experience", "experience_in_current_domain", 1),
+)
+NUMERIC_STATS_GROUPS = {"payment_tier", "joining_year", "age", "experience"}
+
+
+class EmployeeStatsAccumulator:
+    # Per-group [count, leavers] counters. They merge by addition, so byte-range workers and resumed
+    # import batches can each keep a partial copy and the reload sums them instead of rescanning the table.
+    def __init__(self, groups: dict[str, dict[Any, list[int]]] | None = None, total: list[int] | None = None):
+        self.groups = groups or {name: {} for name, _, _ in STATS_GROUPS}
+        self.total = total or [0, 0]
+
+    def track(self, rows: Iterable[tuple], columns: tuple[str, ...]) -> Iterator[tuple]:
+        # Counts rows as they stream past, e.g. on their way into COPY.
+        leave_index = columns.index("leave_or_not")
+        positions = [(self.groups[name], columns.index(column), width) for name, column, width in STATS_GROUPS]
+        total = self.total
+        for row in rows:
+            leaver = row[leave_index]
+            total[0] += 1
+            total[1] += leaver
+            for counters, index, width in positions:
+                key = row[index] if width is None else row[index] // width * width
+                counter = counters.get(key)
+                if counter is None:
+                    counters[key] = [1, leaver]
+                else:
+                    counter[0] += 1
+                    counter[1] += leaver
+            yield row
+
+    def merge(self, other: "EmployeeStatsAccumulator") -> "EmployeeStatsAccumulator":
+        self.total[0] += other.total[0]
+        self.total[1] += other.total[1]
+        for name, counters in other.groups.items():
+            own = self.groups.setdefault(name, {})
+            for key, (count, leavers) in counters.items():
+                counter = own.setdefault(key, [0, 0])
+                counter[0] += count
+                counter[1] += leavers
+        return self
+
+    def to_raw(self) -> dict:
+        # JSON-safe form for checkpoints; object keys become strings.
+        return {
+            "total": self.total,
+            "groups": {name: {str(key): value for key, value in counters.items()} for name, counters in self.groups.items()},
+        }
+
+    @classmethod
+    def from_raw(cls, raw: dict | None) -> "EmployeeStatsAccumulator":
+        if not raw:
+            return cls()
+        groups = {
+            name: {(int(key) if name in NUMERIC_STATS_GROUPS else key): list(value) for key, value in counters.items()}
+            for name, counters in raw["groups"].items()
+        }
+        return cls(groups=groups, total=list(raw["total"]))
+
+    @classmethod
+    def from_database(cls) -> "EmployeeStatsAccumulator":
+        accumulator = cls()
+        for *keys, count, leavers in fetch_employee_group_stats(AGE_BUCKET_WIDTH):
+            # Every grouped column is NOT NULL, so the one non-NULL key names the grouping set.
+            grouped = [(name, key) for (name, _, _), key in zip(STATS_GROUPS, keys) if key is not None]
+            if grouped:
+                name, key = grouped[0]
+                accumulator.groups[name][key] = [int(count), int(leavers or 0)]
+            else:
+                accumulator.total = [int(count), int(leavers or 0)]
+        return accumulator
+
+    def as_stats(self) -> dict:
+        def summary(count: int, leavers: int) -> dict:
+            return {"count": count, "leavers": leavers, "attrition_rate": round(leavers / count, 4) if count else 0.0}
+
+        stats = {
+            **summary(*self.total),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        for name, _, width in STATS_GROUPS:
+            counters = self.groups.get(name, {})
+            if width is None:
+                stats[f"by_{name}"] = [{name: key, **summary(*counters[key])} for key in sorted(counters)]
+            else:
+                stats[f"{name}_histogram"] = [
+                    {f"{name}_from": key, f"{name}_to": key + width - 1, **summary(*counters[key])} for key in sorted(counters)
+                ]
+        return stats
+
+
+def _employee_stats_cache_key() -> str:
+    return f"{EMPLOYEE_STATS_CACHE_KEY_PREFIX}:{get_dataset_generation()}"
+
+
+def store_employee_stats(stats: dict) -> dict:
+    # Refreshed on every reload and by the periodic task; keep it long enough to bridge a missed run.
+    cache.set(_employee_stats_cache_key(), stats, timeout=settings.EMPLOYEE_STATS_REFRESH_SECONDS * 2)
+    return stats
+
+
+def rebuild_employee_stats() -> dict:
+    return store_employee_stats(EmployeeStatsAccumulator.from_database().as_stats())
+
+
+def get_employee_stats() -> dict:
+    stats = cache.get(_employee_stats_cache_key())
+    if stats is None:
+        snapshot = get_employee_snapshot(*get_data_generations())
+        if snapshot is not None:
+            return store_employee_stats(snapshot.stats_accumulator().as_stats())
+        stats = rebuild_employee_stats()
+    return stats
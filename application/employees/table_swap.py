@@ -0,0 +1,192 @@
+import json
+import re
+
+from django.db import connection, transaction
+
+from .models import Employee
+
+
+STAGING_SUFFIX = "_staging"
+STAGING_PROGRESS_SUFFIX = "_staging_progress"
+# benchmark_csv_ingest --copy writes here, so it never touches a staging table an import may resume.
+SCRATCH_SUFFIX = "_ingest_scratch"
+RETIRED_SUFFIX = "_retired"
+TEMPORARY_INDEX_SUFFIX = "_swap"
+# Fail the swap instead of queueing readers behind the ACCESS EXCLUSIVE lock for long.
+SWAP_LOCK_TIMEOUT = "5s"
+
+
+def live_table_name() -> str:
+    return Employee._meta.db_table
+
+
+def staging_table_name() -> str:
+    return f"{live_table_name()}{STAGING_SUFFIX}"
+
+
+def staging_progress_table_name() -> str:
+    return f"{live_table_name()}{STAGING_PROGRESS_SUFFIX}"
+
+
+def scratch_table_name() -> str:
+    return f"{live_table_name()}{SCRATCH_SUFFIX}"
+
+
+def _temporary_name(name: str) -> str:
+    return f"{name[: 63 - len(TEMPORARY_INDEX_SUFFIX)]}{TEMPORARY_INDEX_SUFFIX}"
+
+
+def create_staging_table(drop_existing: bool = True) -> str:
+    # Same columns, defaults and identity as the live table, but no indexes yet so COPY runs at full speed.
+    quote_name = connection.ops.quote_name
+    live, staging, progress = live_table_name(), staging_table_name(), staging_progress_table_name()
+    with connection.cursor() as cursor:
+        if drop_existing:
+            cursor.execute(f"DROP TABLE IF EXISTS {quote_name(staging)}, {quote_name(progress)}")
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote_name(staging)} "
+            f"(LIKE {quote_name(live)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE)"
+        )
+        # One row per byte range: where the next unloaded line starts, how many rows are already in
+        # and the attrition stats of those rows.
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {quote_name(progress)} "
+            "(part integer PRIMARY KEY, next_offset bigint NOT NULL, rows_loaded bigint NOT NULL, "
+            "stats jsonb NOT NULL DEFAULT '{}')"
+        )
+    return staging
+
+
+def drop_staging_table() -> None:
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DROP TABLE IF EXISTS {quote_name(staging_table_name())}, {quote_name(staging_progress_table_name())}"
+        )
+
+
+def create_scratch_table() -> str:
+    quote_name = connection.ops.quote_name
+    live, scratch = live_table_name(), scratch_table_name()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_name(scratch)}")
+        cursor.execute(
+            f"CREATE TABLE {quote_name(scratch)} "
+            f"(LIKE {quote_name(live)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE)"
+        )
+    return scratch
+
+
+def drop_scratch_table() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(scratch_table_name())}")
+
+
+def staging_table_exists() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT to_regclass(%s) IS NOT NULL AND to_regclass(%s) IS NOT NULL",
+            [staging_table_name(), staging_progress_table_name()],
+        )
+        return cursor.fetchone()[0]
+
+
+def read_staging_progress() -> dict[int, tuple[int, int, dict]]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT part, next_offset, rows_loaded, stats FROM {connection.ops.quote_name(staging_progress_table_name())}"
+        )
+        return {
+            part: (next_offset, rows_loaded, json.loads(stats) if isinstance(stats, str) else stats)
+            for part, next_offset, rows_loaded, stats in cursor.fetchall()
+        }
+
+
+def record_staging_progress(part: int, next_offset: int, rows_loaded: int, stats: dict | None = None) -> None:
+    # Called inside the batch's transaction, so the checkpoint and the rows it covers commit together.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {connection.ops.quote_name(staging_progress_table_name())} "
+            "(part, next_offset, rows_loaded, stats) VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (part) DO UPDATE SET next_offset = EXCLUDED.next_offset, "
+            "rows_loaded = EXCLUDED.rows_loaded, stats = EXCLUDED.stats",
+            [part, next_offset, rows_loaded, json.dumps(stats or {})],
+        )
+
+
+def build_staging_indexes() -> list[tuple[str, str, str]]:
+    # Recreates the live table's primary key and indexes on the staging table under temporary names
+    # and returns the (kind, temporary name, final name) renames swap_staging_table() applies.
+    quote_name = connection.ops.quote_name
+    live, staging = live_table_name(), staging_table_name()
+    renames = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+            [live],
+        )
+        primary_key = cursor.fetchone()
+        if primary_key is not None:
+            constraint_name = primary_key[0]
+            temporary_name = _temporary_name(constraint_name)
+            # A resumed import may find leftovers from an index build that was interrupted.
+            cursor.execute(f"ALTER TABLE {quote_name(staging)} DROP CONSTRAINT IF EXISTS {quote_name(temporary_name)}")
+            cursor.execute(
+                f"ALTER TABLE {quote_name(staging)} ADD CONSTRAINT {quote_name(temporary_name)} PRIMARY KEY (id)"
+            )
+            renames.append(("constraint", temporary_name, constraint_name))
+
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+            [live],
+        )
+        for index_name, index_definition in cursor.fetchall():
+            if primary_key is not None and index_name == primary_key[0]:
+                continue
+            temporary_name = _temporary_name(index_name)
+            cursor.execute(f"DROP INDEX IF EXISTS {quote_name(temporary_name)}")
+            definition = index_definition.replace(f" INDEX {index_name} ON ", f" INDEX {temporary_name} ON ", 1)
+            definition = re.sub(
+                rf" ON ((?:\S+\.)?){re.escape(live)} ",
+                lambda match: f" ON {match.group(1)}{staging} ",
+                definition,
+                count=1,
+            )
+            cursor.execute(definition)
+            renames.append(("index", temporary_name, index_name))
+
+        cursor.execute(f"ANALYZE {quote_name(staging)}")
+    return renames
+
+
+def swap_staging_table(renames: list[tuple[str, str, str]]) -> None:
+    # Readers only wait for this short transaction; the old table is dropped once nobody can reach it.
+    quote_name = connection.ops.quote_name
+    live, staging = live_table_name(), staging_table_name()
+    retired = f"{live}{RETIRED_SUFFIX}"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+        cursor.execute(f"LOCK TABLE {quote_name(live)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"ALTER TABLE {quote_name(live)} RENAME TO {quote_name(retired)}")
+        cursor.execute(f"ALTER TABLE {quote_name(staging)} RENAME TO {quote_name(live)}")
+
+        # Tables created by main.py use a serial sequence owned by the old table; hand it over before the drop.
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+            [live],
+        )
+        if cursor.fetchone()[0] == "":
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [retired])
+            sequence_name = cursor.fetchone()[0]
+            if sequence_name:
+                cursor.execute(f"ALTER SEQUENCE {sequence_name} OWNED BY {quote_name(live)}.id")
+
+        cursor.execute(f"DROP TABLE {quote_name(retired)}")
+        cursor.execute(f"DROP TABLE IF EXISTS {quote_name(staging_progress_table_name())}")
+        for kind, temporary_name, final_name in renames:
+            if kind == "constraint":
+                cursor.execute(
+                    f"ALTER TABLE {quote_name(live)} RENAME CONSTRAINT {quote_name(temporary_name)} TO {quote_name(final_name)}"
+                )
+            else:
+                cursor.execute(f"ALTER INDEX {quote_name(temporary_name)} RENAME TO {quote_name(final_name)}")
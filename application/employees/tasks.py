@@ -1,40 +1,323 @@
 from __future__ import annotations
 
-from celery import shared_task
+import math
+import time
+from collections.abc import Iterable
+from datetime import timedelta
+
+from celery import chord, group, shared_task
+from django.conf import settings
+from django.utils import timezone
 
 from .cache_service import (
     PAGE_SIZE,
+    bump_cache_generation,
+    bump_data_generation,
     cache_page_if_missing,
+    cache_pages,
+    get_cached_page_numbers,
+    get_data_generations,
+    get_delta_watermark,
+    invalidate_page_bodies,
+    pop_deleted_employee_ids,
+    refresh_cached_page,
+    set_delta_watermark,
+)
+from .count_service import refresh_employee_count
+from .progress_tracker import BaseProgressTracker, get_progress_tracker
+from .repository import (
+    fetch_changed_page_numbers,
+    fetch_employee_page,
+    fetch_page_number_for_id,
+    fetch_shard_start_ids,
+    iter_employee_rows,
+    iter_employee_rows_in_id_range,
+    serialize_employee_rows,
 )
-from .progress_tracker import ProgressTracker
-from .repository import fetch_employee_page
+from .snapshot import build_employee_snapshot, snapshot_available
+from .stats_service import rebuild_employee_stats
 
 
 JOB_NAME = "employee_cache_refresh"
+DELTA_JOB_NAME = "employee_cache_delta_refresh"
 DEFAULT_BATCH_SIZE = PAGE_SIZE
+# Re-read a small window before the watermark so rows committed while the last run was scanning are not missed.
+DELTA_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def _shard_job_name(shard_index: int) -> str:
+    return f"{JOB_NAME}:shard:{int(shard_index)}"
 
 
 @shared_task(bind=True, name="employees.tasks.refresh_employee_cache")
-def refresh_employee_cache(self, start_after_id: int | None = None, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+def refresh_employee_cache(
+    self,
+    start_after_id: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    bulk: bool | None = None,
+    pages_per_flush: int | None = None,
+    shards: int | None = None,
+    lease_token: str | None = None,
+) -> dict:
     print("This is working and refreshing cache",start_after_id,batch_size)
     batch_size = max(int(batch_size), 1)
-    tracker = ProgressTracker()
+    tracker = get_progress_tracker()
+
+    # Every run holds the lease until it finishes, so beat, a queued resume and a sharded chord never overlap.
+    # A resume queued under the lease hands its token over instead of taking a new one.
+    if lease_token is None:
+        lease_token = tracker.acquire_lease(JOB_NAME)
+        if lease_token is None:
+            return {"skipped": True}
 
+    try:
+        return _refresh_employee_cache(
+            tracker, self.request.id, lease_token, start_after_id, batch_size, bulk, pages_per_flush, shards
+        )
+    except Exception:
+        tracker.release_lease(JOB_NAME, lease_token)
+        raise
+
+
+def _refresh_employee_cache(
+    tracker: BaseProgressTracker,
+    task_id: str | None,
+    lease_token: str,
+    start_after_id: int | None,
+    batch_size: int,
+    bulk: bool | None,
+    pages_per_flush: int | None,
+    shards: int | None,
+) -> dict:
     if start_after_id is None:
         start_after_id = tracker.get_resume_checkpoint(JOB_NAME)
 
     start_after_id = int(start_after_id or 0)
-    tracker.write(JOB_NAME, "STARTED", checkpoint=start_after_id, task_id=self.request.id)
+    total_count = refresh_employee_count()
+    pages_per_flush = max(int(pages_per_flush or settings.EMPLOYEE_CACHE_PAGES_PER_FLUSH), 1)
+    shards = max(int(shards or settings.EMPLOYEE_CACHE_REFRESH_SHARDS), 1)
+
+    # A sharded run checkpoints per shard, so a resumed run fans out again and each shard picks up its own progress.
+    if shards > 1 and start_after_id == 0:
+        return _dispatch_refresh_shards(tracker, total_count, batch_size, pages_per_flush, shards, task_id, lease_token)
+
+    tracker.write(JOB_NAME, "STARTED", checkpoint=start_after_id, task_id=task_id)
+
+    if bulk is None:
+        bulk = settings.EMPLOYEE_CACHE_BULK_WARM
+    if bulk:
+        page_number = (start_after_id // batch_size) + 1
+        processed_count = _warm_pages_bulk(
+            tracker,
+            JOB_NAME,
+            iter_employee_rows(offset=(page_number - 1) * batch_size, chunk_size=batch_size),
+            page_number,
+            batch_size,
+            pages_per_flush,
+            task_id,
+            processed_count=(page_number - 1) * batch_size,
+        )
+    else:
+        processed_count = _warm_pages_serial(tracker, start_after_id, batch_size, task_id)
+
+    bump_cache_generation()
+    tracker.write(JOB_NAME, "COMPLETED", checkpoint=processed_count, processed_count=processed_count)
+    tracker.clear(JOB_NAME)
+    tracker.release_lease(JOB_NAME, lease_token)
+    return {"processed_count": processed_count, "last_checkpoint": processed_count}
+
+
+@shared_task(bind=True, name="employees.tasks.refresh_employee_cache_shard")
+def refresh_employee_cache_shard(
+    self,
+    shard_index: int,
+    first_page: int,
+    start_id: int,
+    end_id: int | None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pages_per_flush: int | None = None,
+) -> dict:
+    batch_size = max(int(batch_size), 1)
+    pages_per_flush = max(int(pages_per_flush or settings.EMPLOYEE_CACHE_PAGES_PER_FLUSH), 1)
+    tracker = get_progress_tracker()
+    job_name = _shard_job_name(shard_index)
+    shard_bounds = {"first_page": first_page, "start_id": start_id, "end_id": end_id}
+
+    page_number = first_page
+    processed_count = 0
+    resume_after_id = start_id - 1
+    latest_state = tracker.get_latest_state(job_name)
+    if latest_state is not None and all(latest_state.payload.get(key) == value for key, value in shard_bounds.items()):
+        if latest_state.state == "COMPLETED":
+            return {"shard": shard_index, "processed_count": int(latest_state.checkpoint or 0)}
+        if "last_id" in latest_state.payload:
+            page_number = int(latest_state.payload["next_page"])
+            processed_count = int(latest_state.checkpoint or 0)
+            resume_after_id = int(latest_state.payload["last_id"])
+
+    tracker.write(job_name, "STARTED", checkpoint=processed_count, task_id=self.request.id, **shard_bounds)
+    try:
+        processed_count = _warm_pages_bulk(
+            tracker,
+            job_name,
+            iter_employee_rows_in_id_range(resume_after_id + 1, end_id, chunk_size=batch_size),
+            page_number,
+            batch_size,
+            pages_per_flush,
+            self.request.id,
+            processed_count=processed_count,
+            **shard_bounds,
+        )
+    except Exception as exc:
+        # Report instead of raising so the chord callback still runs and can hand back the lease;
+        # the shard keeps its last checkpoint and picks up from there on the next run.
+        return {"shard": shard_index, "processed_count": processed_count, "error": repr(exc)}
+    tracker.write(job_name, "COMPLETED", checkpoint=processed_count, processed_count=processed_count, **shard_bounds)
+    return {"shard": shard_index, "processed_count": processed_count}
+
+
+@shared_task(bind=True, name="employees.tasks.complete_employee_cache_refresh")
+def complete_employee_cache_refresh(self, shard_results: list[dict], lease_token: str) -> dict:
+    processed_count = sum(int(result["processed_count"]) for result in shard_results)
+    tracker = get_progress_tracker()
+    failed_shards = [result for result in shard_results if result.get("error")]
+    if failed_shards:
+        # Not a terminal state: the shard checkpoints stay, and a resume or the next beat run fans out again.
+        tracker.write(
+            JOB_NAME,
+            "SHARDS_FAILED",
+            checkpoint=0,
+            processed_count=processed_count,
+            failed_shards=failed_shards,
+            task_id=self.request.id,
+        )
+        tracker.release_lease(JOB_NAME, lease_token)
+        return {"processed_count": processed_count, "shards": len(shard_results), "failed_shards": len(failed_shards)}
+
+    bump_cache_generation()
+    tracker.write(
+        JOB_NAME,
+        "COMPLETED",
+        checkpoint=processed_count,
+        processed_count=processed_count,
+        shards=len(shard_results),
+        task_id=self.request.id,
+    )
+    tracker.clear(JOB_NAME)
+    tracker.release_lease(JOB_NAME, lease_token)
+    return {"processed_count": processed_count, "last_checkpoint": processed_count, "shards": len(shard_results)}
+
+
+@shared_task(bind=True, name="employees.tasks.refresh_employee_stats")
+def refresh_employee_stats(self) -> dict:
+    stats = rebuild_employee_stats()
+    return {"count": stats["count"], "generated_at": stats["generated_at"]}
 
+
+@shared_task(bind=True, name="employees.tasks.refresh_employee_snapshot")
+def refresh_employee_snapshot(self) -> dict:
+    if not snapshot_available():
+        return {"built": False}
+    # Read before the table scan: an edit landing mid-build leaves the snapshot unused, never silently stale.
+    snapshot = build_employee_snapshot(*get_data_generations())
+    return {"built": True, "row_count": snapshot.row_count, "path": str(snapshot.path)}
+
+
+@shared_task(bind=True, name="employees.tasks.refresh_employee_page")
+def refresh_employee_page(self, page: int, page_size: int = DEFAULT_BATCH_SIZE, lock_token: str | None = None) -> dict:
+    employee_data = refresh_cached_page(page, page_size, lock_token)
+    return {"page": page, "processed_count": len(employee_data)}
+
+
+@shared_task(bind=True, name="employees.tasks.refresh_changed_employee_pages")
+def refresh_changed_employee_pages(self, batch_size: int = DEFAULT_BATCH_SIZE, pages_per_flush: int | None = None) -> dict:
+    batch_size = max(int(batch_size), 1)
+    pages_per_flush = max(int(pages_per_flush or settings.EMPLOYEE_CACHE_PAGES_PER_FLUSH), 1)
+    started_at = timezone.now()
+    watermark = get_delta_watermark()
+    if watermark is None:
+        # No baseline to diff against yet; a full refresh establishes one.
+        set_delta_watermark(started_at)
+        refresh_employee_cache.delay(batch_size=batch_size)
+        return {"pages_refreshed": 0, "full_refresh_queued": True}
+
+    tracker = get_progress_tracker()
+    tracker.write(DELTA_JOB_NAME, "STARTED", checkpoint=0, watermark=watermark.isoformat(), task_id=self.request.id)
+
+    cached_pages = set(get_cached_page_numbers())
+    changed_pages = set(fetch_changed_page_numbers(watermark - DELTA_WATERMARK_OVERLAP, batch_size))
+    deleted_ids = pop_deleted_employee_ids()
+    if deleted_ids:
+        first_shifted_page = fetch_page_number_for_id(deleted_ids[0], batch_size)
+        changed_pages.update(page for page in cached_pages if page >= first_shifted_page)
+
+    # Pages nobody has cached are loaded on demand anyway, but a body rendered from them may remain.
+    stale_pages = sorted(changed_pages & cached_pages)
+    invalidate_page_bodies(changed_pages - cached_pages)
+    for index in range(0, len(stale_pages), pages_per_flush):
+        chunk = stale_pages[index : index + pages_per_flush]
+        chunk_started = time.perf_counter()
+        refreshed_pages = {page: fetch_employee_page(page, batch_size) for page in chunk}
+        cache_pages(refreshed_pages, compute_seconds=(time.perf_counter() - chunk_started) / len(chunk))
+        tracker.write(DELTA_JOB_NAME, "CHECKPOINT", checkpoint=index + len(chunk), page=chunk[-1], task_id=self.request.id)
+
+    if changed_pages or deleted_ids:
+        # Rows changed, possibly through bulk updates or raw SQL that no save signal saw.
+        bump_data_generation()
+    set_delta_watermark(started_at)
+    tracker.write(DELTA_JOB_NAME, "COMPLETED", checkpoint=len(stale_pages), pages_refreshed=len(stale_pages))
+    return {"pages_refreshed": len(stale_pages), "full_refresh_queued": False}
+
+
+def _dispatch_refresh_shards(
+    tracker: BaseProgressTracker,
+    total_count: int,
+    batch_size: int,
+    pages_per_flush: int,
+    shards: int,
+    task_id: str | None,
+    lease_token: str,
+) -> dict:
+    # Shards always cover whole pages so no two shards ever write the same page key.
+    pages_per_shard = max(math.ceil(math.ceil(total_count / batch_size) / shards), 1)
+    start_ids = fetch_shard_start_ids(pages_per_shard * batch_size) if total_count else []
+    if not start_ids:
+        tracker.write(JOB_NAME, "COMPLETED", checkpoint=0, processed_count=0)
+        tracker.clear(JOB_NAME)
+        tracker.release_lease(JOB_NAME, lease_token)
+        return {"processed_count": 0, "last_checkpoint": 0, "shards": 0}
+
+    shard_tasks = []
+    for shard_index, start_id in enumerate(start_ids):
+        end_id = start_ids[shard_index + 1] if shard_index + 1 < len(start_ids) else None
+        shard_tasks.append(
+            refresh_employee_cache_shard.s(
+                shard_index,
+                shard_index * pages_per_shard + 1,
+                start_id,
+                end_id,
+                batch_size=batch_size,
+                pages_per_flush=pages_per_flush,
+            )
+        )
+
+    tracker.write(JOB_NAME, "SHARDED", checkpoint=0, shards=len(shard_tasks), task_id=task_id)
+    # The chord callback now owns the lease and releases it once every shard has reported.
+    chord(group(shard_tasks))(complete_employee_cache_refresh.s(lease_token=lease_token))
+    return {"shards": len(shard_tasks), "pages_per_shard": pages_per_shard}
+
+
+def _warm_pages_serial(tracker: BaseProgressTracker, start_after_id: int, batch_size: int, task_id: str | None) -> int:
     processed_count = start_after_id
     page_number = (start_after_id // batch_size) + 1
 
     while True:
+        started = time.perf_counter()
         batch = fetch_employee_page(page_number, batch_size)
         if not batch:
             break
 
-        cache_inserted = cache_page_if_missing(page_number, batch)
+        cache_inserted = cache_page_if_missing(page_number, batch, compute_seconds=time.perf_counter() - started)
         processed_count += len(batch)
         tracker.write(
             JOB_NAME,
@@ -43,20 +326,75 @@ def refresh_employee_cache(self, start_after_id: int | None = None, batch_size:
             processed_count=processed_count,
             page=page_number,
             cache_inserted=cache_inserted,
-            task_id=self.request.id,
+            task_id=task_id,
         )
         page_number += 1
 
-    tracker.write(JOB_NAME, "COMPLETED", checkpoint=processed_count, processed_count=processed_count)
-    tracker.clear()
-    return {"processed_count": processed_count, "last_checkpoint": processed_count}
+    return processed_count
+
+
+def _warm_pages_bulk(
+    tracker: BaseProgressTracker,
+    job_name: str,
+    rows: Iterable[tuple],
+    page_number: int,
+    batch_size: int,
+    pages_per_flush: int,
+    task_id: str | None,
+    processed_count: int = 0,
+    **checkpoint_payload,
+) -> int:
+    # One streaming scan feeds many pages; each flush is one pipelined write plus one checkpoint.
+    pending_pages: dict[int, list[dict]] = {}
+    page_rows: list[tuple] = []
+    flush_started = time.perf_counter()
+
+    def flush() -> None:
+        nonlocal processed_count, flush_started
+        cache_pages(pending_pages, compute_seconds=(time.perf_counter() - flush_started) / len(pending_pages))
+        last_page = max(pending_pages)
+        processed_count += sum(len(employee_data) for employee_data in pending_pages.values())
+        tracker.write(
+            job_name,
+            "CHECKPOINT",
+            checkpoint=processed_count,
+            processed_count=processed_count,
+            page=last_page,
+            next_page=last_page + 1,
+            last_id=pending_pages[last_page][-1]["id"],
+            pages_flushed=len(pending_pages),
+            task_id=task_id,
+            **checkpoint_payload,
+        )
+        pending_pages.clear()
+        flush_started = time.perf_counter()
+
+    for row in rows:
+        page_rows.append(row)
+        if len(page_rows) < batch_size:
+            continue
+        pending_pages[page_number] = serialize_employee_rows(page_rows)
+        page_rows = []
+        page_number += 1
+        if len(pending_pages) >= pages_per_flush:
+            flush()
+
+    if page_rows:
+        pending_pages[page_number] = serialize_employee_rows(page_rows)
+    if pending_pages:
+        flush()
+    return processed_count
 
 
 def queue_resume_if_needed() -> None:
-    tracker = ProgressTracker()
+    tracker = get_progress_tracker()
     if not tracker.has_incomplete_job(JOB_NAME):
         return
+    # Every worker runs this on startup; only the one taking the lease queues the resume, which inherits it.
+    lease_token = tracker.acquire_lease(JOB_NAME)
+    if lease_token is None:
+        return
 
     checkpoint = tracker.get_resume_checkpoint(JOB_NAME)
     tracker.write(JOB_NAME, "RESUME_QUEUED", checkpoint=checkpoint)
-    refresh_employee_cache.delay(start_after_id=checkpoint)
+    refresh_employee_cache.delay(start_after_id=checkpoint, lease_token=lease_token)
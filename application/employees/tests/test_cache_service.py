@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from employees import cache_service
+
+
+class WarmedPageTimeoutTests(SimpleTestCase):
+    def test_warmed_pages_outlive_the_full_refresh_interval(self):
+        self.assertGreater(cache_service._warmed_page_timeout(), settings.EMPLOYEE_FULL_REFRESH_SECONDS)
+        self.assertGreaterEqual(cache_service._warmed_page_timeout(), cache_service._page_timeout())
+
+    @override_settings(EMPLOYEE_FULL_REFRESH_SECONDS=7200, EMPLOYEE_PAGE_STALE_GRACE_SECONDS=60)
+    def test_longer_full_refresh_interval_extends_page_timeout(self):
+        self.assertEqual(cache_service._warmed_page_timeout(), 7260)
+
+    def test_beat_schedule_uses_full_refresh_setting(self):
+        schedule = settings.CELERY_BEAT_SCHEDULE["refresh-employee-cache"]["schedule"]
+        self.assertEqual(schedule, settings.EMPLOYEE_FULL_REFRESH_SECONDS)
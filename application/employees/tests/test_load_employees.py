@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from employees import ingest
+from employees.ingest import IMPORT_JOB_NAME
+from employees.models import Employee
+from employees.progress_tracker import get_progress_tracker
+from employees.table_swap import drop_staging_table, staging_table_exists
+from employees.tests.utils import make_employees
+
+
+CSV_HEADER = "Education,JoiningYear,City,PaymentTier,Age,Gender,EverBenched,ExperienceInCurrentDomain,LeaveOrNot"
+CSV_ROW = "Bachelors,2017,Pune,3,34,Male,No,0,0"
+# Counts, stats and the import lease go through the plain cache API, so they stay in this process.
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "load-employees-tests"}
+}
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "load_employees streams rows through PostgreSQL COPY")
+@override_settings(CACHES=LOCMEM_CACHES)
+class LoadEmployeesTests(TransactionTestCase):
+    def setUp(self):
+        self.tmp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(PROGRESS_LOG_PATH=self.tmp_dir / "progress.log"))
+        # The generation bump talks to Redis directly (INCR in a MULTI); only its call matters here.
+        self.bump_dataset_generation = self.enterContext(
+            mock.patch("employees.management.commands.load_employees.bump_dataset_generation")
+        )
+        self.addCleanup(drop_staging_table)
+
+    def write_csv(self, rows: list[str]) -> Path:
+        csv_path = self.tmp_dir / "employees.csv"
+        csv_path.write_text("\n".join([CSV_HEADER, *rows]) + "\n", encoding="utf-8")
+        return csv_path
+
+    def load(self, csv_path: Path, *args: str) -> None:
+        stderr = StringIO()
+        try:
+            call_command("load_employees", "--csv-path", str(csv_path), *args, stdout=StringIO(), stderr=stderr)
+        finally:
+            self.stderr = stderr.getvalue()
+
+    def test_malformed_row_raises_command_error(self):
+        # bulk_create skips the save signals, which would bump the generation in Redis.
+        Employee.objects.bulk_create(
+            [
+                Employee(
+                    education="Masters", joining_year=2015, city="Delhi", payment_tier=2, age=30,
+                    gender="Female", ever_benched="No", experience_in_current_domain=3, leave_or_not=0,
+                )
+            ]
+        )
+        csv_path = self.write_csv([CSV_ROW] * 1500 + [CSV_ROW.replace("2017", "notayear")])
+
+        with self.assertRaisesMessage(CommandError, "Invalid CSV row at line 1502"):
+            self.load(csv_path)
+        # The delete and the COPY share one transaction, so the old rows survive a failed load.
+        self.assertEqual(Employee.objects.count(), 1)
+        self.bump_dataset_generation.assert_not_called()
+
+    def test_header_only_csv_has_no_byte_ranges(self):
+        csv_path = self.write_csv([])
+
+        self.assertEqual(ingest.split_csv_byte_ranges(csv_path, 4), (CSV_HEADER.split(","), []))
+        make_employees(1)
+        self.load(csv_path, "--swap", "--workers", "4")
+        self.assertEqual(Employee.objects.count(), 0)
+
+    def test_byte_ranges_stay_inside_a_short_data_section(self):
+        csv_path = self.write_csv([CSV_ROW])
+        data_start = len(CSV_HEADER) + 1
+
+        _, byte_ranges = ingest.split_csv_byte_ranges(csv_path, 64)
+        self.assertEqual(byte_ranges[0][0], data_start)
+        self.assertEqual(byte_ranges[-1][1], csv_path.stat().st_size)
+        self.assertTrue(all(start < end <= csv_path.stat().st_size for start, end in byte_ranges))
+
+    def test_malformed_row_fails_staged_import(self):
+        csv_path = self.write_csv([CSV_ROW] * 1500 + [CSV_ROW.replace("2017", "notayear")])
+
+        with self.assertRaisesMessage(CommandError, "Invalid CSV row at byte offset"):
+            self.load(csv_path, "--swap", "--batch-rows", "500")
+        self.assertNotIn("--resume", self.stderr)
+        self.assertEqual(get_progress_tracker().get_latest_state(IMPORT_JOB_NAME).state, "FAILED")
+        self.assertFalse(staging_table_exists())
+
+        # A failed import is not resumable; the file has to be fixed and loaded again.
+        with self.assertRaisesMessage(CommandError, "No interrupted import to resume."):
+            self.load(csv_path, "--resume")
+
+    def test_truncated_row_fails_staged_import(self):
+        csv_path = self.write_csv([CSV_ROW] * 10 + ["Bachelors,2015,Pune"])
+
+        with self.assertRaisesMessage(CommandError, "expected 9 fields, got 3"):
+            self.load(csv_path, "--swap")
+        self.assertEqual(get_progress_tracker().get_latest_state(IMPORT_JOB_NAME).state, "FAILED")
+
+    def test_resume_continues_after_last_checkpoint(self):
+        csv_path = self.write_csv([CSV_ROW] * 1500)
+        record_staging_progress = ingest.record_staging_progress
+        calls = 0
+
+        def interrupt_second_batch(*args):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise KeyboardInterrupt
+            record_staging_progress(*args)
+
+        with mock.patch.object(ingest, "record_staging_progress", side_effect=interrupt_second_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                self.load(csv_path, "--swap", "--batch-rows", "500")
+        self.assertIn("rerun with --resume", self.stderr)
+        self.assertTrue(staging_table_exists())
+        self.assertEqual(get_progress_tracker().get_latest_state(IMPORT_JOB_NAME).state, "STARTED")
+
+        self.load(csv_path, "--resume", "--batch-rows", "500")
+        # The rolled-back second batch is loaded again, the committed first one is not.
+        self.assertEqual(Employee.objects.count(), 1500)
+        self.assertFalse(staging_table_exists())
+        self.assertIsNone(get_progress_tracker().get_latest_state(IMPORT_JOB_NAME))
+        self.bump_dataset_generation.assert_called_once_with()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+
+from employees import snapshot
+from employees.cache_service import CACHE_SOURCE_SNAPSHOT, get_data_generations, get_filtered_employees_for_display
+from employees.filters import parse_employee_query
+from employees.models import Employee
+from employees.snapshot import get_employee_snapshot
+from employees.tasks import refresh_employee_cache, refresh_employee_snapshot
+from employees.tests.utils import RedisCacheTestMixin, make_employees, requires_test_redis
+
+
+@requires_test_redis
+@unittest.skipUnless(snapshot.np is not None, "the columnar snapshot needs numpy")
+class EmployeeSnapshotTests(RedisCacheTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(
+            override_settings(
+                EMPLOYEE_SNAPSHOT_ENABLED=True,
+                EMPLOYEE_SNAPSHOT_DIR=tmp_dir / "snapshots",
+                PROGRESS_LOG_PATH=tmp_dir / "progress.log",
+            )
+        )
+        self.addCleanup(snapshot._snapshot_state.update, snapshot=None, checked_at=0.0)
+        make_employees(20)
+        make_employees(10, city="Bangalore")
+        refresh_employee_snapshot()
+
+    def current_snapshot(self):
+        # Skip the once-a-second re-read of current.json.
+        snapshot._snapshot_state["checked_at"] = 0.0
+        return get_employee_snapshot(*get_data_generations())
+
+    def test_snapshot_survives_cache_refresh(self):
+        self.assertIsNotNone(self.current_snapshot())
+
+        refresh_employee_cache()
+
+        self.assertIsNotNone(self.current_snapshot())
+        employees, source = get_filtered_employees_for_display(parse_employee_query(QueryDict("city=Bangalore")), 1)
+        self.assertEqual(source, CACHE_SOURCE_SNAPSHOT)
+        self.assertEqual(len(employees), 10)
+
+    def test_row_edit_retires_snapshot(self):
+        employee = Employee.objects.first()
+        employee.city = "Bangalore"
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.save()
+
+        self.assertIsNone(self.current_snapshot())
+        employees, source = get_filtered_employees_for_display(parse_employee_query(QueryDict("city=Bangalore")), 1)
+        self.assertNotEqual(source, CACHE_SOURCE_SNAPSHOT)
+        self.assertEqual(len(employees), 11)
@@ -0,0 +1,97 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from employees.progress_tracker import get_progress_tracker
+from employees.tasks import (
+    JOB_NAME,
+    _shard_job_name,
+    complete_employee_cache_refresh,
+    queue_resume_if_needed,
+    refresh_employee_cache,
+    refresh_employee_cache_shard,
+)
+from employees.tests.utils import RedisCacheTestMixin, make_employees, requires_test_redis
+
+
+@requires_test_redis
+@override_settings(EMPLOYEE_CACHE_REFRESH_SHARDS=1)
+class EmployeeCacheRefreshLeaseTests(RedisCacheTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(PROGRESS_LOG_PATH=tmp_dir / "progress.log"))
+        self.tracker = get_progress_tracker()
+        make_employees(25)
+
+    def test_run_is_skipped_while_lease_is_held(self):
+        lease_token = self.tracker.acquire_lease(JOB_NAME)
+
+        self.assertEqual(refresh_employee_cache(), {"skipped": True})
+        self.assertIsNone(self.tracker.get_latest_state(JOB_NAME))
+        # The skipped run must not have released someone else's lease.
+        self.assertIsNone(self.tracker.acquire_lease(JOB_NAME))
+        self.tracker.release_lease(JOB_NAME, lease_token)
+
+    def test_run_releases_its_own_lease(self):
+        self.assertEqual(refresh_employee_cache()["processed_count"], 25)
+        self.assertIsNotNone(self.tracker.acquire_lease(JOB_NAME))
+
+    def test_queued_resume_inherits_the_lease(self):
+        self.tracker.write(JOB_NAME, "CHECKPOINT", checkpoint=10)
+        with mock.patch.object(refresh_employee_cache, "delay") as delay:
+            queue_resume_if_needed()
+            queue_resume_if_needed()
+
+        delay.assert_called_once()
+        # Beat cannot start a second run while the resume is queued.
+        self.assertEqual(refresh_employee_cache(), {"skipped": True})
+        self.assertEqual(refresh_employee_cache(**delay.call_args.kwargs)["processed_count"], 25)
+        self.assertIsNotNone(self.tracker.acquire_lease(JOB_NAME))
+
+    def test_completion_keeps_a_lease_it_does_not_own(self):
+        lease_token = self.tracker.acquire_lease(JOB_NAME)
+
+        complete_employee_cache_refresh([{"shard": 0, "processed_count": 25}], lease_token="expired-run")
+        self.assertIsNone(self.tracker.acquire_lease(JOB_NAME))
+        self.tracker.release_lease(JOB_NAME, lease_token)
+        self.assertIsNotNone(self.tracker.acquire_lease(JOB_NAME))
+
+
+@requires_test_redis
+class EmployeeCacheShardFailureTests(RedisCacheTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(PROGRESS_LOG_PATH=tmp_dir / "progress.log"))
+        self.tracker = get_progress_tracker()
+        employees = make_employees(25)
+        self.shards = [(0, 1, employees[0].id, employees[20].id), (1, 3, employees[20].id, None)]
+
+    def run_shards(self) -> list[dict]:
+        return [refresh_employee_cache_shard(*shard, batch_size=10) for shard in self.shards]
+
+    def test_failed_shard_keeps_the_refresh_incomplete(self):
+        lease_token = self.tracker.acquire_lease(JOB_NAME)
+        with mock.patch("employees.tasks.cache_pages", side_effect=[None, ConnectionError("redis went away")]):
+            shard_results = self.run_shards()
+
+        self.assertIn("redis went away", shard_results[1]["error"])
+        result = complete_employee_cache_refresh(shard_results, lease_token=lease_token)
+        self.assertEqual(result["failed_shards"], 1)
+        self.assertEqual(self.tracker.get_latest_state(JOB_NAME).state, "SHARDS_FAILED")
+        self.assertTrue(self.tracker.has_incomplete_job(JOB_NAME))
+        # Checkpoints survive, so the finished shard is not warmed again.
+        self.assertEqual(self.tracker.get_latest_state(_shard_job_name(0)).state, "COMPLETED")
+        self.assertEqual(self.tracker.get_latest_state(_shard_job_name(1)).state, "STARTED")
+        self.assertIsNotNone(self.tracker.acquire_lease(JOB_NAME))
+
+    def test_refresh_completes_once_every_shard_succeeds(self):
+        lease_token = self.tracker.acquire_lease(JOB_NAME)
+        result = complete_employee_cache_refresh(self.run_shards(), lease_token=lease_token)
+
+        self.assertEqual(result["processed_count"], 25)
+        self.assertIsNone(self.tracker.get_latest_state(JOB_NAME))
+        self.assertIsNone(self.tracker.get_latest_state(_shard_job_name(0)))
@@ -0,0 +1,112 @@
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from employees.auth import authenticate_api_token, issue_api_token
+from employees.cache_service import (
+    _cached_pages_key,
+    _employee_page_cache_key,
+    bump_dataset_generation,
+    set_delta_watermark,
+)
+from employees.models import Employee
+from employees.tasks import refresh_changed_employee_pages, refresh_employee_cache
+from employees.tests.utils import RedisCacheTestMixin, make_employees, requires_test_redis
+
+
+@requires_test_redis
+class EmployeeListApiTestCase(RedisCacheTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(PROGRESS_LOG_PATH=tmp_dir / "progress.log"))
+        make_employees(5)
+        # As after load_employees, so the generations and Last-Modified exist.
+        bump_dataset_generation()
+        self.user = get_user_model().objects.create_user("reader", password="unused-password")
+        self.headers = {"Authorization": f"Bearer {issue_api_token(self.user)}"}
+
+    def get_list(self, **headers):
+        return self.client.get("/api/employees/", headers={**self.headers, **headers})
+
+    def edit_first_employee(self, city: str) -> None:
+        employee = Employee.objects.first()
+        employee.city = city
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.save()
+
+
+class EmployeeListConditionalRequestTests(EmployeeListApiTestCase):
+    def test_cache_refresh_keeps_validators(self):
+        response = self.get_list()
+        self.assertEqual(response.status_code, 200)
+
+        refresh_employee_cache()
+
+        self.assertEqual(self.get_list(if_none_match=response["ETag"]).status_code, 304)
+        self.assertEqual(self.get_list(if_modified_since=response["Last-Modified"]).status_code, 304)
+
+    def test_row_edit_changes_validators(self):
+        set_delta_watermark(timezone.now())
+        response = self.get_list()
+        self.edit_first_employee("Delhi")
+
+        self.assertEqual(self.get_list(if_none_match=response["ETag"]).status_code, 200)
+
+        # The delta refresh rewrites the cached page and moves the validators once more.
+        refresh_changed_employee_pages()
+        refreshed = self.get_list(if_none_match=response["ETag"])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(refreshed.json()["results"][0]["city"], "Delhi")
+
+
+class EmployeePageBodyTests(EmployeeListApiTestCase):
+    def test_edit_after_page_entry_expired_drops_body(self):
+        set_delta_watermark(timezone.now())
+        self.assertEqual(self.get_list().json()["results"][0]["city"], "Pune")
+        # The page entry expires while the pre-serialized body of the same page is still cached.
+        cache.delete_many([_employee_page_cache_key(1), _cached_pages_key()])
+
+        self.edit_first_employee("Delhi")
+        refresh_changed_employee_pages()
+
+        self.assertEqual(self.get_list().json()["results"][0]["city"], "Delhi")
+
+
+class EmployeeApiTokenTests(EmployeeListApiTestCase):
+    def test_valid_token_is_accepted(self):
+        self.assertEqual(self.get_list().status_code, 200)
+
+    def test_tampered_token_is_rejected(self):
+        response = self.get_list(authorization=self.headers["Authorization"][:-1] + "x")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], 'Bearer realm="api"')
+
+    @override_settings(API_TOKEN_MAX_AGE_SECONDS=60)
+    def test_expired_token_is_rejected(self):
+        with mock.patch("django.core.signing.time.time", return_value=time.time() - 120):
+            token = issue_api_token(self.user)
+
+        self.assertEqual(self.get_list(authorization=f"Bearer {token}").status_code, 401)
+
+    def test_request_without_token_falls_back_to_session(self):
+        self.headers = {}
+        self.assertEqual(self.get_list().status_code, 302)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.get_list().status_code, 200)
+
+    def test_deactivated_user_loads_as_anonymous(self):
+        request = RequestFactory().get("/api/employees/")
+        self.assertTrue(authenticate_api_token(request, self.headers["Authorization"].removeprefix("Bearer ")))
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+
+        self.assertFalse(request.user.is_authenticated)
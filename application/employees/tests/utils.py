@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+
+from employees import cache_service
+from employees.models import Employee
+
+
+# cache_service talks to Redis directly (pipelines, SETs, locks, Lua), so its tests need a real server.
+# TEST_REDIS_URL must point at a disposable database: it is flushed before and after every test.
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+requires_test_redis = unittest.skipUnless(TEST_REDIS_URL, "set TEST_REDIS_URL to a disposable Redis database")
+
+
+class RedisCacheTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(CACHES={"default": {**settings.CACHES["default"], "LOCATION": TEST_REDIS_URL}}))
+        self.reset_cache()
+        self.addCleanup(self.reset_cache)
+
+    @staticmethod
+    def reset_cache() -> None:
+        cache.clear()
+        cache_service._local_cache.clear()
+        cache_service._generation_state.update(generations=None, data_generation=None, changed_at=None, checked_at=0.0)
+
+
+def make_employees(count: int, **fields) -> list[Employee]:
+    # bulk_create skips the save signals, so seeding does not count as an edit.
+    defaults = {
+        "education": "Bachelors",
+        "joining_year": 2017,
+        "city": "Pune",
+        "payment_tier": 3,
+        "age": 34,
+        "gender": "Male",
+        "ever_benched": "No",
+        "experience_in_current_domain": 0,
+        "leave_or_not": 0,
+    }
+    return Employee.objects.bulk_create([Employee(**{**defaults, **fields}) for _ in range(count)])
@@ -1,19 +1,30 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
     api_login_view,
     api_signup_view,
+    employee_export_api_view,
+    employee_list_api_async_view,
     employee_list_api_view,
     employee_list_view,
+    employee_stats_api_view,
     login_view,
     logout_view,
+    metrics_api_view,
     signup_view,
 )
 
 
+# Under ASGI the list API takes its async view; sync gunicorn workers keep the plain one.
+employee_list_api = employee_list_api_async_view if settings.WEB_SERVER == "uvicorn" else employee_list_api_view
+
 urlpatterns = [
     path("", employee_list_view, name="employee-list"),
-    path("api/employees/", employee_list_api_view, name="employee-list-api"),
+    path("api/employees/", employee_list_api, name="employee-list-api"),
+    path("api/employees/stats/", employee_stats_api_view, name="employee-stats-api"),
+    path("api/employees/export/", employee_export_api_view, name="employee-export-api"),
+    path("api/metrics/", metrics_api_view, name="metrics-api"),
     path("api/signup/", api_signup_view, name="api-signup"),
     path("api/login/", api_login_view, name="api-login"),
     path("signup/", signup_view, name="signup"),
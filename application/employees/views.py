@@ -1,14 +1,69 @@
+import base64
+import hashlib
 import json
+import os
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
 from django.views.decorators.csrf import csrf_exempt
 
-from .cache_service import PAGE_SIZE, get_employees_for_display
-from .repository import fetch_employee_count
+from config.pools import get_pool_metrics
+
+from .auth import api_login_required, issue_api_token
+from .cache_service import (
+    BODY_ENCODING_IDENTITY,
+    CACHE_SOURCE_DB,
+    CACHE_SOURCE_REDIS,
+    PAGE_SIZE,
+    CachedPageBody,
+    aget_cached_page_body,
+    aget_employee_data_version,
+    cache_employee_rows_html,
+    cache_page_body,
+    decompress_page_body,
+    get_cached_page_body,
+    get_employees_for_display,
+    get_filtered_employee_count,
+    get_cache_stats,
+    get_cached_employee_rows_html,
+    get_employee_data_version,
+    get_filtered_employees_for_display,
+)
+from .count_service import get_employee_count
+from .export import (
+    EXPORT_CONTENT_TYPES,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    async_chunks,
+    export_format_available,
+    gzip_chunks,
+    iter_employee_export,
+)
+from .filters import DEFAULT_EMPLOYEE_QUERY, EmployeeQuery, EmployeeQueryError, parse_employee_query
+from .repository import fetch_employee_batch_after_id, fetch_employee_batch_before_id, iter_filtered_employee_rows
+from .stats_service import get_employee_stats
+
+
+PAGINATION_PAGE = "page"
+PAGINATION_CURSOR = "cursor"
+CURSOR_AFTER = "after"
+CURSOR_BEFORE = "before"
+# Employee.id is a BigAutoField; larger cursor ids would fail in PostgreSQL instead of returning 400.
+MAX_CURSOR_ID = 2**63 - 1
+EXPORT_CURSOR_CHUNK_ROWS = 5000
+EMPLOYEE_ROWS_TEMPLATE = "employees/_employee_rows.html"
 
 
 def _parse_page_param(request: HttpRequest) -> int:
@@ -20,6 +75,80 @@ def _parse_page_param(request: HttpRequest) -> int:
     return max(page, 1)
 
 
+def _encode_cursor(employee_id: int) -> str:
+    raw = json.dumps({"id": int(employee_id)}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        employee_id = int(payload["id"])
+    except (ValueError, TypeError, KeyError, OverflowError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not 0 <= employee_id <= MAX_CURSOR_ID:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return employee_id
+
+
+def _parse_cursor_param(request: HttpRequest) -> tuple[str, int] | None:
+    # An empty `after` starts cursor pagination from the first row.
+    if CURSOR_AFTER in request.GET:
+        cursor = request.GET[CURSOR_AFTER]
+        return CURSOR_AFTER, _decode_cursor(cursor) if cursor else 0
+    if CURSOR_BEFORE in request.GET:
+        return CURSOR_BEFORE, _decode_cursor(request.GET[CURSOR_BEFORE])
+    return None
+
+
+def _is_cursor_request(request: HttpRequest) -> bool:
+    return CURSOR_AFTER in request.GET or CURSOR_BEFORE in request.GET
+
+
+def _accepts_encoding(request: HttpRequest, encoding: str) -> bool:
+    accepted = request.headers.get("Accept-Encoding", "")
+    return encoding in {part.split(";", 1)[0].strip().lower() for part in accepted.split(",")}
+
+
+def _encode_json_body(payload: dict) -> bytes:
+    return json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")
+
+
+def _page_body_response(request: HttpRequest, cached_body: CachedPageBody) -> HttpResponse:
+    if cached_body.encoding != BODY_ENCODING_IDENTITY and _accepts_encoding(request, cached_body.encoding):
+        response = HttpResponse(cached_body.body, content_type="application/json")
+        response["Content-Encoding"] = cached_body.encoding
+    else:
+        response = HttpResponse(decompress_page_body(cached_body), content_type="application/json")
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+def _list_validators(request: HttpRequest, version: tuple[int, int, int | None], *extra) -> tuple[str, int | None]:
+    # Every row change and reload bumps the data generation, so it plus the query string identifies the
+    # response without loading it. Cache refreshes leave it alone and keep clients' copies valid.
+    data_generation, dataset_generation, changed_at = version
+    params = "&".join(f"{name}={','.join(values)}" for name, values in sorted(request.GET.lists()))
+    key = "|".join(map(str, (dataset_generation, data_generation, params, *extra)))
+    return f'W/"{hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()}"', changed_at
+
+
+def _with_validators(response: HttpResponse, etag: str, last_modified: int | None) -> HttpResponse:
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # Clients may keep the page but must revalidate it, which costs them a 304.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _not_modified(request: HttpRequest, etag: str, last_modified: int | None) -> HttpResponse | None:
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return _with_validators(response, etag, last_modified) if response is not None else None
+
+
 def _parse_request_data(request: HttpRequest) -> tuple[dict, JsonResponse | None]:
     if request.content_type and "application/json" in request.content_type.lower():
         try:
@@ -35,9 +164,21 @@ def _parse_request_data(request: HttpRequest) -> tuple[dict, JsonResponse | None
     return request.POST.dict(), None
 
 
-def _build_employee_pagination_context(page: int) -> dict:
-    employees, source = get_employees_for_display(page=page, page_size=PAGE_SIZE)
-    total_count = fetch_employee_count()
+def _employee_count(query: EmployeeQuery, estimate_count: bool) -> int:
+    if query.filters:
+        return get_filtered_employee_count(query)
+    return get_employee_count(estimate=estimate_count)
+
+
+def _build_employee_pagination_context(
+    page: int, estimate_count: bool = False, query: EmployeeQuery = DEFAULT_EMPLOYEE_QUERY
+) -> dict:
+    if query.is_default:
+        employees, source = get_employees_for_display(page=page, page_size=PAGE_SIZE)
+    else:
+        employees, source = get_filtered_employees_for_display(query, page=page, page_size=PAGE_SIZE)
+    total_count = _employee_count(query, estimate_count)
+    cursors = query.supports_cursor
     range_start = ((page - 1) * PAGE_SIZE) + 1 if total_count > 0 else 0
     range_end = min(page * PAGE_SIZE, total_count) if total_count > 0 else 0
     has_prev = page > 1
@@ -47,6 +188,7 @@ def _build_employee_pagination_context(page: int) -> dict:
         "employees": employees,
         "source": source,
         "count": total_count,
+        "pagination": PAGINATION_PAGE,
         "page": page,
         "page_size": PAGE_SIZE,
         "range_start": range_start,
@@ -55,24 +197,188 @@ def _build_employee_pagination_context(page: int) -> dict:
         "has_next": has_next,
         "prev_page": page - 1,
         "next_page": page + 1,
+        "prev_cursor": _encode_cursor(employees[0]["id"]) if cursors and has_prev and employees else None,
+        "next_cursor": _encode_cursor(employees[-1]["id"]) if cursors and has_next and employees else None,
     }
 
 
-@login_required
-def employee_list_view(request: HttpRequest) -> HttpResponse:
-    page = _parse_page_param(request)
-    context = _build_employee_pagination_context(page)
-    return render(request, "employees/employee_list.html", context)
+def _build_employee_cursor_context(
+    direction: str, cursor_id: int, estimate_count: bool = False, query: EmployeeQuery = DEFAULT_EMPLOYEE_QUERY
+) -> dict:
+    # Fetch one extra row to learn whether another page exists in the walking direction.
+    if direction == CURSOR_AFTER:
+        rows = fetch_employee_batch_after_id(cursor_id, PAGE_SIZE + 1, query=query)
+        employees = rows[:PAGE_SIZE]
+        has_prev = cursor_id > 0
+        has_next = len(rows) > PAGE_SIZE
+    else:
+        rows = fetch_employee_batch_before_id(cursor_id, PAGE_SIZE + 1, query=query)
+        employees = rows[-PAGE_SIZE:]
+        has_prev = len(rows) > PAGE_SIZE
+        has_next = True
 
+    return {
+        "employees": employees,
+        "source": CACHE_SOURCE_DB,
+        "count": _employee_count(query, estimate_count),
+        "pagination": PAGINATION_CURSOR,
+        "page": None,
+        "page_size": PAGE_SIZE,
+        "has_prev": has_prev and bool(employees),
+        "has_next": has_next and bool(employees),
+        "prev_cursor": _encode_cursor(employees[0]["id"]) if has_prev and employees else None,
+        "next_cursor": _encode_cursor(employees[-1]["id"]) if has_next and employees else None,
+    }
 
-@login_required
-def employee_list_api_view(request: HttpRequest) -> JsonResponse:
-    page = _parse_page_param(request)
-    payload = _build_employee_pagination_context(page)
+
+def _build_employee_list_context(
+    request: HttpRequest, estimate_count: bool = False, query: EmployeeQuery = DEFAULT_EMPLOYEE_QUERY
+) -> dict:
+    cursor = _parse_cursor_param(request)
+    if cursor is not None:
+        if not query.supports_cursor:
+            raise EmployeeQueryError("Cursor pagination is only available with sort=id.")
+        return _build_employee_cursor_context(*cursor, estimate_count=estimate_count, query=query)
+    return _build_employee_pagination_context(_parse_page_param(request), estimate_count=estimate_count, query=query)
+
+
+def render_employee_rows(employees: list[dict]) -> str:
+    return render_to_string(EMPLOYEE_ROWS_TEMPLATE, {"employees": employees})
+
+
+def _employee_rows_html(context: dict) -> str:
+    # The 1000-row table body dominates the page's render time, so offset pages reuse a rendered copy.
+    if context["pagination"] != PAGINATION_PAGE:
+        return mark_safe(render_employee_rows(context["employees"]))
+    html = get_cached_employee_rows_html(context["page"])
+    if html is None:
+        html = render_employee_rows(context["employees"])
+        cache_employee_rows_html(context["page"], html)
+    return mark_safe(html)
+
+
+def _employee_list_api_response(request: HttpRequest, query: EmployeeQuery) -> HttpResponse:
+    try:
+        payload = _build_employee_list_context(request, query=query)
+    except EmployeeQueryError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+    except ValueError:
+        return JsonResponse({"detail": "Invalid pagination cursor."}, status=400)
     payload["results"] = payload.pop("employees")
+    if not query.is_default:
+        payload["filters"] = query.as_params()
+        payload["sort"] = query.sort
+
+    if query.is_default and payload["pagination"] == PAGINATION_PAGE:
+        # Later hits for this page are answered from the stored body, i.e. from Redis.
+        cached_payload = {**payload, "source": CACHE_SOURCE_REDIS}
+        cache_page_body(payload["page"], _encode_json_body(cached_payload), payload["count"])
     return JsonResponse(payload)
 
 
+@login_required
+def employee_list_view(request: HttpRequest) -> HttpResponse:
+    # The page greets the user and embeds a CSRF token, so both are part of its validator.
+    etag, last_modified = _list_validators(
+        request, get_employee_data_version(), request.user.pk, request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+    )
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    try:
+        context = _build_employee_list_context(request, estimate_count=settings.EMPLOYEE_COUNT_ESTIMATE_FOR_UI)
+    except ValueError:
+        return redirect("employee-list")
+    context["employee_rows_html"] = _employee_rows_html(context)
+    return _with_validators(render(request, "employees/employee_list.html", context), etag, last_modified)
+
+
+@api_login_required
+def employee_list_api_view(request: HttpRequest) -> HttpResponse:
+    try:
+        query = parse_employee_query(request.GET)
+    except EmployeeQueryError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+
+    etag, last_modified = _list_validators(request, get_employee_data_version())
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    if query.is_default and not _is_cursor_request(request):
+        cached_body = get_cached_page_body(_parse_page_param(request))
+        if cached_body is not None:
+            return _with_validators(_page_body_response(request, cached_body), etag, last_modified)
+    return _with_validators(_employee_list_api_response(request, query), etag, last_modified)
+
+
+@api_login_required
+async def employee_list_api_async_view(request: HttpRequest) -> HttpResponse:
+    # Served under ASGI (WEB_SERVER=uvicorn). Cached page bodies are answered on the event loop;
+    # anything that needs the ORM runs the sync path in a worker thread.
+    try:
+        query = parse_employee_query(request.GET)
+    except EmployeeQueryError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+
+    etag, last_modified = _list_validators(request, await aget_employee_data_version())
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    if query.is_default and not _is_cursor_request(request):
+        cached_body = await aget_cached_page_body(_parse_page_param(request))
+        if cached_body is not None:
+            return _with_validators(_page_body_response(request, cached_body), etag, last_modified)
+    response = await sync_to_async(_employee_list_api_response)(request, query)
+    return _with_validators(response, etag, last_modified)
+
+
+@api_login_required
+def employee_export_api_view(request: HttpRequest) -> HttpResponse:
+    export_format = request.GET.get("format", EXPORT_FORMAT_CSV).lower()
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return JsonResponse({"detail": f"Unknown export format; use one of {', '.join(EXPORT_CONTENT_TYPES)}."}, status=400)
+    if not export_format_available(export_format):
+        return JsonResponse({"detail": "Parquet export needs the pyarrow package."}, status=400)
+    try:
+        query = parse_employee_query(request.GET)
+    except EmployeeQueryError as exc:
+        return JsonResponse({"detail": str(exc)}, status=400)
+
+    # One server-side-cursor scan rendered chunk by chunk, so memory stays flat however big the table is.
+    chunks = iter_employee_export(iter_filtered_employee_rows(query, chunk_size=EXPORT_CURSOR_CHUNK_ROWS), export_format)
+    # Parquet pages are already compressed.
+    compress = export_format != EXPORT_FORMAT_PARQUET and _accepts_encoding(request, "gzip")
+    if compress:
+        chunks = gzip_chunks(chunks)
+    if isinstance(request, ASGIRequest):
+        chunks = async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[export_format])
+    if compress:
+        response["Content-Encoding"] = "gzip"
+    response["Content-Disposition"] = f'attachment; filename="employees.{export_format}"'
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
+@api_login_required
+def employee_stats_api_view(request: HttpRequest) -> JsonResponse:
+    return JsonResponse(get_employee_stats())
+
+
+@api_login_required
+def metrics_api_view(request: HttpRequest) -> JsonResponse:
+    # Figures are for the process that answered; each gunicorn/Celery process keeps its own.
+    database_pool = getattr(connections["default"], "pool", None)
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "cache": get_cache_stats(),
+            "pools": get_pool_metrics(),
+            "database_pool": database_pool.get_stats() if database_pool is not None else None,
+        }
+    )
+
+
 @csrf_exempt
 def api_signup_view(request: HttpRequest) -> JsonResponse:
     if request.method != "POST":
@@ -92,6 +398,8 @@ def api_signup_view(request: HttpRequest) -> JsonResponse:
         {
             "message": "Signup successful.",
             "user": {"id": user.id, "username": user.username},
+            "token": issue_api_token(user),
+            "token_expires_in": settings.API_TOKEN_MAX_AGE_SECONDS,
         },
         status=201,
     )
@@ -116,6 +424,8 @@ def api_login_view(request: HttpRequest) -> JsonResponse:
         {
             "message": "Login successful.",
             "user": {"id": user.id, "username": user.username},
+            "token": issue_api_token(user),
+            "token_expires_in": settings.API_TOKEN_MAX_AGE_SECONDS,
         }
     )
 
@@ -5,6 +5,8 @@ Railway/local web-service entry point.
 2. Loads Employee CSV data into PostgreSQL (idempotent).
 3. Collects static files.
 4. Starts gunicorn on Railway, runserver locally.
+   WEB_SERVER=uvicorn serves config.asgi instead: gunicorn with uvicorn
+   workers on Railway, uvicorn locally.
 """
 import os
 import subprocess
@@ -56,12 +58,14 @@ def main() -> int:
     # Step 3 - Collect static files.
     run([sys.executable, "manage.py", "collectstatic", "--noinput"], cwd=app_dir)
 
-    # Step 4 - Start server (Railway: gunicorn, local: runserver).
+    # Step 4 - Start server (Railway: gunicorn, local: runserver or uvicorn).
+    use_asgi = os.getenv("WEB_SERVER", "gunicorn").lower() == "uvicorn"
     if os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("RAILWAY_PUBLIC_DOMAIN"):
-        print(f">>> Starting gunicorn on 0.0.0.0:{port}", flush=True)
+        print(f">>> Starting gunicorn ({'uvicorn' if use_asgi else 'sync'} workers) on 0.0.0.0:{port}", flush=True)
         cmd = [
             "gunicorn",
-            "config.wsgi:application",
+            "config.asgi:application" if use_asgi else "config.wsgi:application",
+            *(["--worker-class", "uvicorn_worker.UvicornWorker"] if use_asgi else []),
             "--bind",
             f"0.0.0.0:{port}",
             "--workers",
@@ -73,6 +77,9 @@ def main() -> int:
             "--error-logfile",
             "-",
         ]
+    elif use_asgi:
+        print(f">>> Starting uvicorn on 127.0.0.1:{port}", flush=True)
+        cmd = ["uvicorn", "config.asgi:application", "--host", "127.0.0.1", "--port", port]
     else:
         print(f">>> Starting Django runserver on 127.0.0.1:{port}", flush=True)
         cmd = [sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}"]